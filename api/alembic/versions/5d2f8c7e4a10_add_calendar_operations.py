@@ -0,0 +1,73 @@
+"""add_calendar_operations
+
+Revision ID: 5d2f8c7e4a10
+Revises: e7b3d5a9c1f4
+Create Date: 2026-10-19 14:02:37.190455
+
+Adds calendar_operations, tags attendance rows created by an operation, and
+makes (employee_id, date) unique so bulk inserts can use ON CONFLICT. Any
+duplicate attendance rows for the same employee and day (possible before,
+from concurrent check-ins) are removed first, keeping the earliest one.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8c7e4a10'
+down_revision: Union[str, Sequence[str], None] = 'e7b3d5a9c1f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('calendar_operations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM('PRESENT', 'ABSENT', 'LEAVE', 'HOLIDAY', 'SICK_LEAVE', 'VACATION', name='attendancestatus', create_type=False), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('department', sa.String(), nullable=True),
+    sa.Column('include_weekends', sa.Boolean(), nullable=False),
+    sa.Column('records_created', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('undone_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_calendar_operations_id'), 'calendar_operations', ['id'], unique=False)
+
+    # Batch mode so SQLite, which can't ALTER constraints, recreates the table instead
+    with op.batch_alter_table('attendance') as batch_op:
+        batch_op.add_column(sa.Column('calendar_operation_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'attendance_calendar_operation_id_fkey', 'calendar_operations', ['calendar_operation_id'], ['id']
+        )
+
+    op.execute("""
+        DELETE FROM attendance
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (PARTITION BY employee_id, date ORDER BY id) AS position
+                FROM attendance
+            ) AS ranked
+            WHERE position > 1
+        )
+    """)
+    op.drop_index('ix_attendance_employee_date', table_name='attendance')
+    op.create_index('uq_attendance_employee_date', 'attendance', ['employee_id', 'date'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_attendance_employee_date', table_name='attendance')
+    op.create_index('ix_attendance_employee_date', 'attendance', ['employee_id', 'date'], unique=False)
+    with op.batch_alter_table('attendance') as batch_op:
+        batch_op.drop_constraint('attendance_calendar_operation_id_fkey', type_='foreignkey')
+        batch_op.drop_column('calendar_operation_id')
+    op.drop_index(op.f('ix_calendar_operations_id'), table_name='calendar_operations')
+    op.drop_table('calendar_operations')
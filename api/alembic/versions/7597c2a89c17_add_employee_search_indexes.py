@@ -0,0 +1,52 @@
+"""add_employee_search_indexes
+
+Revision ID: 7597c2a89c17
+Revises: 23dac0fd895e
+Create Date: 2026-10-19 10:12:41.529305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7597c2a89c17'
+down_revision: Union[str, Sequence[str], None] = '23dac0fd895e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must stay identical to the expression built in app/services/search_service.py
+# so the planner can use the index
+EMPLOYEE_SEARCH_DOCUMENT = (
+    "lower(first_name || ' ' || last_name || ' ' || employee_id || ' ' || "
+    "coalesce(department, '') || ' ' || coalesce(position, ''))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Trigram indexes are Postgres-only; elsewhere search uses its in-process index
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Build without locking writes on large tables
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_employees_search_trgm "
+            f"ON employees USING gin (({EMPLOYEE_SEARCH_DOCUMENT}) gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_trgm "
+            "ON users USING gin ((lower(email)) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_employees_search_trgm")
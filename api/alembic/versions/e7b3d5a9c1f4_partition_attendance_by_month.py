@@ -0,0 +1,111 @@
+"""partition_attendance_by_month
+
+Revision ID: e7b3d5a9c1f4
+Revises: c4e8a1f6b2d9
+Create Date: 2026-10-19 13:05:12.774019
+
+Rebuilds attendance as a Postgres table range-partitioned by month on `date`.
+The primary key becomes (id, date) because a partitioned table's unique
+constraints must include the partition key; ids still come from the same
+sequence and stay unique. Partitions are created for every month with data
+through three months ahead, plus a default partition for anything outside;
+app.services.partition_service creates later months. Other databases keep
+the plain table.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3d5a9c1f4'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f6b2d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, employee_id, date, check_in_time, check_out_time, status, notes, created_at, updated_at"
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.create_index('ix_attendance_employee_date', 'attendance', ['employee_id', 'date'], unique=False)
+        return
+
+    op.execute("ALTER TABLE attendance RENAME TO attendance_unpartitioned")
+    op.execute("ALTER INDEX attendance_pkey RENAME TO attendance_unpartitioned_pkey")
+    op.execute("ALTER INDEX ix_attendance_id RENAME TO ix_attendance_unpartitioned_id")
+    op.execute("""
+        CREATE TABLE attendance (
+            id INTEGER NOT NULL DEFAULT nextval('attendance_id_seq'),
+            employee_id INTEGER NOT NULL REFERENCES employees (id),
+            date DATE NOT NULL,
+            check_in_time TIMESTAMP WITHOUT TIME ZONE,
+            check_out_time TIMESTAMP WITHOUT TIME ZONE,
+            status attendancestatus NOT NULL,
+            notes TEXT,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT attendance_pkey PRIMARY KEY (id, date)
+        ) PARTITION BY RANGE (date)
+    """)
+    op.create_index(op.f('ix_attendance_id'), 'attendance', ['id'], unique=False)
+    op.create_index('ix_attendance_employee_date', 'attendance', ['employee_id', 'date'], unique=False)
+    op.execute("CREATE TABLE attendance_default PARTITION OF attendance DEFAULT")
+
+    first_day = bind.execute(sa.text("SELECT min(date) FROM attendance_unpartitioned")).scalar()
+    last_month = _add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    month = (first_day or date.today()).replace(day=1)
+    while month <= last_month:
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE attendance_y{month.year}m{month.month:02d} PARTITION OF attendance "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        )
+        month = following
+
+    op.execute(f"INSERT INTO attendance ({COLUMNS}) SELECT {COLUMNS} FROM attendance_unpartitioned")
+    op.execute("ALTER SEQUENCE attendance_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE attendance_unpartitioned")
+    op.execute("ALTER SEQUENCE attendance_id_seq OWNED BY attendance.id")
+    op.execute("ANALYZE attendance")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        op.drop_index('ix_attendance_employee_date', table_name='attendance')
+        return
+
+    op.execute("ALTER TABLE attendance RENAME TO attendance_partitioned")
+    op.execute("ALTER INDEX attendance_pkey RENAME TO attendance_partitioned_pkey")
+    op.execute("ALTER INDEX ix_attendance_id RENAME TO ix_attendance_partitioned_id")
+    op.execute("ALTER INDEX ix_attendance_employee_date RENAME TO ix_attendance_partitioned_employee_date")
+    op.execute("""
+        CREATE TABLE attendance (
+            id INTEGER NOT NULL DEFAULT nextval('attendance_id_seq'),
+            employee_id INTEGER NOT NULL REFERENCES employees (id),
+            date DATE NOT NULL,
+            check_in_time TIMESTAMP WITHOUT TIME ZONE,
+            check_out_time TIMESTAMP WITHOUT TIME ZONE,
+            status attendancestatus NOT NULL,
+            notes TEXT,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT attendance_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.create_index(op.f('ix_attendance_id'), 'attendance', ['id'], unique=False)
+    op.execute(f"INSERT INTO attendance ({COLUMNS}) SELECT {COLUMNS} FROM attendance_partitioned")
+    op.execute("ALTER SEQUENCE attendance_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE attendance_partitioned")
+    op.execute("ALTER SEQUENCE attendance_id_seq OWNED BY attendance.id")
@@ -0,0 +1,28 @@
+"""add_idempotency_key_lease
+
+Revision ID: f3a9c6d2b8e1
+Revises: 5d2f8c7e4a10
+Create Date: 2026-10-19 20:05:12.384611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c6d2b8e1'
+down_revision: Union[str, Sequence[str], None] = '5d2f8c7e4a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('idempotency_keys', sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('idempotency_keys', 'locked_until')
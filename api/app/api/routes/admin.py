@@ -1,17 +1,45 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import io
+from typing import List, Literal, Optional, Union
+from datetime import date
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 from app.core.database import get_db
+from app.core.fieldsets import fields_param, parse_fields, sparse_query, sparse_response, sparse_rows
+from app.core.integrity import INVITATION_DUPLICATES, USER_DUPLICATES, duplicate_detail, violated_unique_column
+from app.core.lookups import employee_by_id, invalidate_employees, user_by_id
+from app.core.replicas import get_read_db
 from app.core.auth import require_admin, get_password_hash
 from app.models.user import User
 from app.models.employee import Employee
 from app.models.invitation import Invitation, InvitationStatus
 from app.models.salary import SalaryRecord, SalaryStatus
+from app.models.calendar import CalendarOperation
 from app.schemas.user import UserCreate, UserResponse
-from app.schemas.employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse
-from app.schemas.invitation import InvitationCreate, InvitationResponse
+from app.schemas.employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse, EmployeeSearchResult, EmployeeBulkUpdate, EmployeeBulkUpdatePreview, EmployeeBulkUpdateResponse
+from app.schemas.invitation import InvitationCreate, InvitationResponse, InvitationBulkResponse
 from app.schemas.salary import SalaryRecordUpdate, SalaryRecordResponse
-from app.services.email_service import send_salary_update_notification, send_employee_invitation
+from app.schemas.work_hours import WorkHoursSummary, OvertimeApplyResponse
+from app.schemas.audit import AuditLogPage
+from app.schemas.calendar import AttendanceCloseOutResponse, CalendarOperationCreate, CalendarOperationPreview, CalendarOperationResponse, CalendarUndoResponse
+from app.schemas.workforce import WorkforceImportResponse
+from app.schemas.dashboard import DashboardSummary
+from app.services.analytics_service import invalidate_attendance_analytics
+from app.services.archive_service import archived_salary_records
+from app.services.audit_service import AUDITED_ENTITIES, audit_history, audit_log, diff_changes
+from app.services.calendar_service import MAX_CALENDAR_DAYS, apply_calendar_operation, calendar_days, close_out_attendance, preview_calendar_operation, undo_calendar_operation
+from app.services.dashboard_service import dashboard_summary
+from app.services.email_service import send_salary_update_notification, send_employee_invitation, send_employee_invitations
+from app.services.employee_bulk_service import MAX_SALARY, apply_bulk_update, preview_bulk_update, salaries_out_of_range
+from app.services.invitation_service import MAX_BULK_INVITATIONS, create_invitations_bulk, parse_invitations_csv
+from app.services.payroll_service import invalidate_payroll_aggregates
+from app.services.search_service import search_employees, invalidate_employee_search
+from app.services.work_hours_service import work_hours, apply_overtime_to_salary_records
+from app.services.workforce_service import WorkforceImportInterrupted, import_workforce, iter_workforce_csv
 
 router = APIRouter()
 
@@ -21,15 +49,6 @@ async def create_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
-    db_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
-    ).first()
-    if db_user:
-        raise HTTPException(
-            status_code=400,
-            detail="Username or email already registered"
-        )
-    
     hashed_password = get_password_hash(user.password)
     db_user = User(
         username=user.username,
@@ -38,60 +57,88 @@ async def create_user(
         role=user.role
     )
     db.add(db_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        detail = duplicate_detail(e, USER_DUPLICATES)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail)
     db.refresh(db_user)
     return db_user
 
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
-    db: Session = Depends(get_db),
+    fields: Optional[str] = fields_param("id,username"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
+    selected = parse_fields(fields, UserResponse)
+    if selected:
+        return sparse_response(sparse_rows(sparse_query(db, User, selected).all()))
     users = db.query(User).all()
     return users
 
+@router.get("/dashboard", response_model=DashboardSummary)
+async def get_dashboard_summary(current_user: User = Depends(require_admin)):
+    """Headcount, today's attendance, pending invitations and this month's unpaid salaries, refreshed every few seconds"""
+    return await dashboard_summary()
+
 @router.get("/employees", response_model=List[EmployeeResponse])
 async def get_all_employees(
-    db: Session = Depends(get_db),
+    fields: Optional[str] = fields_param("id,first_name,last_name,department,position"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
-    employees = db.query(Employee).all()
+    selected = parse_fields(fields, EmployeeResponse)
+    if selected:
+        query = sparse_query(db, Employee, selected, relations={"user": UserResponse})
+        return sparse_response(sparse_rows(query.all()))
+    # The nested user is part of every full response, so load it in the same query
+    employees = db.query(Employee).options(joinedload(Employee.user)).all()
     return employees
 
+@router.get("/employees/search", response_model=List[EmployeeSearchResult])
+async def search_all_employees(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    return search_employees(db, q, limit)
+
 @router.post("/invitations", response_model=InvitationResponse)
 async def create_employee_invitation(
     invitation: InvitationCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
-    # Check if user with email already exists
-    existing_user = db.query(User).filter(User.email == invitation.email).first()
-    if existing_user:
+    # These two rules span tables, so no constraint enforces them: one query checks both
+    email_registered, employee_id_taken = db.query(
+        exists().where(User.email == invitation.email),
+        exists().where(Employee.employee_id == invitation.employee_id),
+    ).one()
+    if email_registered:
         raise HTTPException(status_code=400, detail="User with this email already exists")
-    
-    # Check if invitation with email already exists and is pending
-    existing_invitation = db.query(Invitation).filter(
-        Invitation.email == invitation.email,
-        Invitation.status == InvitationStatus.PENDING
-    ).first()
-    if existing_invitation:
-        raise HTTPException(status_code=400, detail="Pending invitation already exists for this email")
-    
-    # Check if employee_id already exists
-    existing_employee = db.query(Employee).filter(Employee.employee_id == invitation.employee_id).first()
-    if existing_employee:
+    if employee_id_taken:
         raise HTTPException(status_code=400, detail="Employee ID already exists")
     
-    existing_invitation_emp_id = db.query(Invitation).filter(
-        Invitation.employee_id == invitation.employee_id
-    ).first()
-    if existing_invitation_emp_id:
-        raise HTTPException(status_code=400, detail="Employee ID already exists in pending invitations")
-    
-    # Create invitation
+    # Duplicate invitations are rejected by the unique email and employee_id constraints
     db_invitation = Invitation(**invitation.dict())
     db.add(db_invitation)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        detail = duplicate_detail(e, INVITATION_DUPLICATES)
+        if detail is None:
+            raise
+        if violated_unique_column(e) == "invitations.email":
+            status_of_existing = db.query(Invitation.status).filter(Invitation.email == invitation.email).scalar()
+            if status_of_existing != InvitationStatus.PENDING:
+                detail = "Invitation already exists for this email"
+        raise HTTPException(status_code=400, detail=detail)
     db.refresh(db_invitation)
     
     # Send invitation email
@@ -99,11 +146,82 @@ async def create_employee_invitation(
     
     return db_invitation
 
+@router.post("/invitations/bulk", response_model=InvitationBulkResponse)
+async def create_employee_invitations_bulk(
+    invitations: List[InvitationCreate],
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    if len(invitations) > MAX_BULK_INVITATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_INVITATIONS} invitations per batch")
+    
+    rows = list(enumerate(invitations, start=1))
+    created, errors = create_invitations_bulk(db, rows)
+    
+    # Queue all invitation emails as one batch after the response is sent
+    background_tasks.add_task(send_employee_invitations, [(inv.email, inv.token) for inv in created])
+    
+    return {"created": created, "errors": errors}
+
+@router.post("/invitations/bulk/csv", response_model=InvitationBulkResponse)
+async def import_employee_invitations_csv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    try:
+        content = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV file must be UTF-8 encoded")
+    
+    rows, errors = parse_invitations_csv(content)
+    if len(rows) + len(errors) > MAX_BULK_INVITATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_INVITATIONS} invitations per batch")
+    
+    created, insert_errors = create_invitations_bulk(db, rows)
+    errors = sorted(errors + insert_errors, key=lambda error: error.row)
+    
+    background_tasks.add_task(send_employee_invitations, [(inv.email, inv.token) for inv in created])
+    
+    return {"created": created, "errors": errors}
+
+@router.post("/workforce/import", response_model=WorkforceImportResponse)
+async def import_workforce_csv(
+    file: UploadFile = File(...),
+    start_after_row: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Create users and their employee records from a CSV, committed in batches.
+
+    Columns: username, email, password (optional, generated when empty), role, and the employee
+    fields. Rows up to `start_after_row` are skipped, so a failed import can be resumed from
+    the `last_row` it reached. When a batch fails the response (400 for a file that is not
+    UTF-8, 500 otherwise) still carries the `last_row` committed before it and why it `stopped`.
+    """
+    # Read the spooled upload as a stream instead of loading the whole file into memory
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        # Hashing and inserting thousands of rows must not block the event loop
+        return await run_in_threadpool(import_workforce, db, iter_workforce_csv(stream), start_after_row)
+    except WorkforceImportInterrupted as interrupted:
+        # The progress up to the failure, so the client knows where to resume
+        status_code = 400 if isinstance(interrupted.__cause__, UnicodeDecodeError) else 500
+        return JSONResponse(jsonable_encoder(WorkforceImportResponse(**interrupted.result)), status_code=status_code)
+    finally:
+        stream.detach()
+
 @router.get("/invitations", response_model=List[InvitationResponse])
 async def get_all_invitations(
-    db: Session = Depends(get_db),
+    fields: Optional[str] = fields_param("id,email,status"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
+    selected = parse_fields(fields, InvitationResponse)
+    if selected:
+        return sparse_response(sparse_rows(sparse_query(db, Invitation, selected).all()))
     invitations = db.query(Invitation).all()
     return invitations
 
@@ -119,13 +237,49 @@ async def update_employee(
         raise HTTPException(status_code=404, detail="Employee not found")
     
     update_data = employee_update.dict(exclude_unset=True)
+    changes = diff_changes(db_employee, update_data)
     for field, value in update_data.items():
         setattr(db_employee, field, value)
     
     db.commit()
     db.refresh(db_employee)
+    invalidate_employees([(db_employee.id, db_employee.user_id)])
+    invalidate_employee_search()
+    if "department" in changes:
+        # Department totals of every year are grouped by the employee's current department
+        invalidate_payroll_aggregates()
+    audit_log.record("employee", db_employee.id, changes, current_user.id)
     return db_employee
 
+@router.post("/employees/bulk-update", response_model=Union[EmployeeBulkUpdateResponse, EmployeeBulkUpdatePreview])
+async def bulk_update_employees(
+    bulk_update: EmployeeBulkUpdate,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Move employees selected by ids and/or department to a new department or position, or change their salary"""
+    if not bulk_update.filter.employee_ids and bulk_update.filter.department is None:
+        raise HTTPException(status_code=400, detail="Select employees by employee_ids or department")
+    change = bulk_update.change.dict(exclude_none=True)
+    if not change:
+        raise HTTPException(status_code=400, detail="No change given")
+    if "salary_percent" in change and "salary_amount" in change:
+        raise HTTPException(status_code=400, detail="Give either salary_percent or salary_amount, not both")
+    
+    out_of_range = salaries_out_of_range(db, bulk_update.filter, bulk_update.change)
+    if out_of_range:
+        raise HTTPException(
+            status_code=400,
+            detail=f"The salary change would take {out_of_range} of the selected employees below 0 or above {MAX_SALARY}",
+        )
+    
+    if dry_run:
+        return preview_bulk_update(db, bulk_update.filter, bulk_update.change)
+    
+    updated = apply_bulk_update(db, bulk_update.filter, bulk_update.change, current_user.id)
+    return {"updated": len(updated), "employees": updated}
+
 @router.put("/salary-records/{salary_id}", response_model=SalaryRecordResponse)
 async def update_salary_record(
     salary_id: int,
@@ -139,15 +293,18 @@ async def update_salary_record(
     
     old_status = db_salary.status
     update_data = salary_update.dict(exclude_unset=True)
+    changes = diff_changes(db_salary, update_data)
     for field, value in update_data.items():
         setattr(db_salary, field, value)
     
     db.commit()
     db.refresh(db_salary)
+    invalidate_payroll_aggregates(db_salary.year)
+    audit_log.record("salary_record", db_salary.id, changes, current_user.id)
     
     if old_status != db_salary.status and db_salary.status == SalaryStatus.PAID:
-        employee = db.query(Employee).filter(Employee.id == db_salary.employee_id).first()
-        user = db.query(User).filter(User.id == employee.user_id).first()
+        employee = employee_by_id(db, db_salary.employee_id)
+        user = user_by_id(db, employee.user_id)
         await send_salary_update_notification(user.email, employee, db_salary)
     
     return db_salary
@@ -155,12 +312,120 @@ async def update_salary_record(
 @router.get("/employees/{employee_id}/salary-records", response_model=List[SalaryRecordResponse])
 async def get_employee_salary_records(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+    employee = employee_by_id(db, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    salary_records = db.query(SalaryRecord).filter(SalaryRecord.employee_id == employee_id).all()
-    return salary_records
\ No newline at end of file
+    salary_records = db.query(SalaryRecord).filter(SalaryRecord.employee_id == employee_id).order_by(
+        SalaryRecord.year, SalaryRecord.month
+    ).all()
+    return archived_salary_records(employee_id) + salary_records
+
+@router.get("/work-hours", response_model=List[WorkHoursSummary])
+async def get_work_hours(
+    start_date: date,
+    end_date: date,
+    period: Literal["day", "week", "month", "year"] = "month",
+    department: Optional[str] = None,
+    employee_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+    return work_hours(db, start_date, end_date, period=period, employee_ids=employee_ids, department=department)
+
+@router.post("/salary-records/apply-overtime", response_model=OvertimeApplyResponse)
+async def apply_overtime(
+    year: int = Query(..., ge=1, le=9999),
+    month: int = Query(..., ge=1, le=12),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    updated = apply_overtime_to_salary_records(db, year, month, current_user.id)
+    invalidate_payroll_aggregates(year)
+    return {"year": year, "month": month, "updated": updated}
+
+@router.get("/audit-log/{entity_type}/{entity_id}", response_model=AuditLogPage)
+async def get_audit_history(
+    entity_type: Literal[AUDITED_ENTITIES],
+    entity_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[int] = Query(None, description="Return entries older than this entry id"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    # Flushing the buffer is a blocking insert, kept off the event loop
+    entries = await run_in_threadpool(audit_history, db, entity_type, entity_id, limit, before)
+    next_before = entries[-1].id if len(entries) == limit else None
+    return {"entries": entries, "next_before": next_before}
+
+@router.post("/calendar", response_model=Union[CalendarOperationResponse, CalendarOperationPreview])
+async def create_calendar_operation(
+    calendar: CalendarOperationCreate,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Apply a status (e.g. a public holiday) to all employees or one department across a date range"""
+    if calendar.start_date > calendar.end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+    days = calendar_days(calendar.start_date, calendar.end_date, calendar.include_weekends)
+    if len(days) > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CALENDAR_DAYS} days per calendar operation")
+    if not days:
+        raise HTTPException(status_code=400, detail="The date range contains no days to apply")
+    
+    if dry_run:
+        return preview_calendar_operation(db, days, calendar.department)
+    
+    operation = CalendarOperation(**calendar.dict(), created_by=current_user.id)
+    apply_calendar_operation(db, operation)
+    invalidate_attendance_analytics()
+    return operation
+
+@router.get("/calendar", response_model=List[CalendarOperationResponse])
+async def get_calendar_operations(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    return db.query(CalendarOperation).order_by(CalendarOperation.id.desc()).all()
+
+@router.delete("/calendar/{operation_id}", response_model=CalendarUndoResponse)
+async def undo_calendar(
+    operation_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    operation = db.query(CalendarOperation).filter(CalendarOperation.id == operation_id).first()
+    if not operation:
+        raise HTTPException(status_code=404, detail="Calendar operation not found")
+    if operation.undone_at is not None:
+        raise HTTPException(status_code=400, detail="Calendar operation was already undone")
+    
+    removed = undo_calendar_operation(db, operation)
+    invalidate_attendance_analytics()
+    return {"id": operation.id, "records_removed": removed}
+
+@router.post("/attendance/close-out", response_model=AttendanceCloseOutResponse)
+async def close_out_attendance_days(
+    start_date: date,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Mark employees without a record ABSENT and close open check-ins for past days; safe to repeat"""
+    end_date = end_date or start_date
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+    if end_date >= date.today():
+        raise HTTPException(status_code=400, detail="Only days before today can be closed out")
+    if (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CALENDAR_DAYS} days per request; use close_out_attendance.py for longer backfills")
+    
+    result = close_out_attendance(db, start_date, end_date, current_user.id)
+    invalidate_attendance_analytics()
+    return result
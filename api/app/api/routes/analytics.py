@@ -0,0 +1,90 @@
+from typing import List, Literal, Optional
+from datetime import date, time
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core.auth import require_admin
+from app.core.config import settings
+from app.core.replicas import get_read_db
+from app.models.user import User
+from app.schemas.analytics import AbsenceStreak, DepartmentAttendanceStats
+from app.schemas.payroll import PayrollMonth, PayrollYear
+from app.services import analytics_service, payroll_service
+
+router = APIRouter()
+
+def _check_range(start_date: date, end_date: date):
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+
+def _check_years(start_year: int, end_year: int):
+    if start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must be on or before end_year")
+    if end_year - start_year >= payroll_service.MAX_PAYROLL_YEARS:
+        raise HTTPException(status_code=400, detail=f"At most {payroll_service.MAX_PAYROLL_YEARS} years per request")
+    archived = payroll_service.archived_payroll_years(start_year, end_year)
+    if archived:
+        raise HTTPException(
+            status_code=400, detail=payroll_service.ARCHIVED_YEARS_DETAIL.format(years=", ".join(map(str, archived)))
+        )
+
+@router.get("/attendance", response_model=List[DepartmentAttendanceStats])
+async def get_attendance_analytics(
+    start_date: date,
+    end_date: date,
+    period: Literal["day", "week", "month", "year"] = "month",
+    department: Optional[str] = None,
+    late_after: Optional[time] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    _check_range(start_date, end_date)
+    return analytics_service.attendance_summary(
+        db,
+        start_date,
+        end_date,
+        period=period,
+        department=department,
+        late_after=late_after or settings.late_check_in_cutoff,
+    )
+
+@router.get("/attendance/absence-streaks", response_model=List[AbsenceStreak])
+async def get_absence_streaks(
+    start_date: date,
+    end_date: date,
+    department: Optional[str] = None,
+    min_days: int = Query(2, ge=1),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    _check_range(start_date, end_date)
+    return analytics_service.absence_streaks(db, start_date, end_date, department=department, min_days=min_days)
+
+@router.get("/payroll/monthly", response_model=List[PayrollMonth])
+async def get_payroll_by_month(
+    start_year: int,
+    end_year: int,
+    group_by: Literal["department", "employee"] = "department",
+    department: Optional[str] = None,
+    employee_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    _check_years(start_year, end_year)
+    return payroll_service.payroll_by_month(
+        db, start_year, end_year, group_by=group_by, department=department, employee_id=employee_id
+    )
+
+@router.get("/payroll/yearly", response_model=List[PayrollYear])
+async def get_payroll_by_year(
+    start_year: int,
+    end_year: int,
+    group_by: Literal["department", "employee"] = "department",
+    department: Optional[str] = None,
+    employee_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    _check_years(start_year, end_year)
+    return payroll_service.payroll_by_year(
+        db, start_year, end_year, group_by=group_by, department=department, employee_id=employee_id
+    )
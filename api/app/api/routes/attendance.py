@@ -1,13 +1,21 @@
 from typing import List, Optional
 from datetime import date, datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.lookups import employee_by_id, employee_for_user
+from app.core.fieldsets import fields_param, parse_fields, pick_fields, sparse_query, sparse_response, sparse_rows
+from app.core.replicas import get_read_db
 from app.core.auth import get_current_active_user, require_admin
 from app.models.user import User
-from app.models.employee import Employee
 from app.models.attendance import Attendance, AttendanceStatus
-from app.schemas.attendance import AttendanceCreate, AttendanceUpdate, AttendanceResponse
+from app.schemas.attendance import AttendanceCreate, AttendanceUpdate, AttendanceResponse, AttendanceGrid
+from app.services.analytics_service import invalidate_attendance_analytics
+from app.services.archive_service import archived_attendance
+from app.services.attendance_grid_service import MAX_GRID_DAYS, MAX_GRID_EMPLOYEES, attendance_grid
+from app.services.attendance_board_service import board_snapshot, board_stream, publish_attendance_event, subscribe_to_board
+from app.services.audit_service import audit_log, diff_changes
 
 router = APIRouter()
 
@@ -16,7 +24,7 @@ async def check_in(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
+    employee = employee_for_user(db, current_user)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee record not found")
     
@@ -31,6 +39,7 @@ async def check_in(
             raise HTTPException(status_code=400, detail="Already checked in today")
         existing_attendance.check_in_time = datetime.now()
         existing_attendance.status = AttendanceStatus.PRESENT
+        attendance = existing_attendance
     else:
         attendance = Attendance(
             employee_id=employee.id,
@@ -41,6 +50,7 @@ async def check_in(
         db.add(attendance)
     
     db.commit()
+    publish_attendance_event("check_in", attendance, employee)
     return {"message": "Checked in successfully", "time": datetime.now()}
 
 @router.post("/check-out")
@@ -48,7 +58,7 @@ async def check_out(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
+    employee = employee_for_user(db, current_user)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee record not found")
     
@@ -66,6 +76,7 @@ async def check_out(
     
     attendance.check_out_time = datetime.now()
     db.commit()
+    publish_attendance_event("check_out", attendance, employee)
     return {"message": "Checked out successfully", "time": datetime.now()}
 
 @router.post("/", response_model=AttendanceResponse)
@@ -74,7 +85,7 @@ async def submit_attendance(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
+    employee = employee_for_user(db, current_user)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee record not found")
     
@@ -93,20 +104,46 @@ async def submit_attendance(
     db.add(db_attendance)
     db.commit()
     db.refresh(db_attendance)
+    invalidate_attendance_analytics()
     return db_attendance
 
+@router.get("/live")
+async def attendance_live(
+    request: Request,
+    department: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Server-sent events: a `snapshot` of today's board, then `check_in`/`check_out` rows to upsert by employee_id"""
+    if getattr(request.state, "batch_db", None) is not None:
+        # Checked before subscribing: a stream never ends, so it can't be part of POST /api/batch
+        raise HTTPException(status_code=400, detail="The live board can't be requested through /api/batch")
+    # Subscribe before taking the snapshot so no event can fall between the two
+    subscription = subscribe_to_board(department)
+    snapshot = board_snapshot(db, department)
+    # Give the connection back to the pool instead of holding it for the lifetime of the stream
+    db.close()
+    return StreamingResponse(
+        board_stream(request, subscription, snapshot, department),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/my-attendance", response_model=List[AttendanceResponse])
 async def get_my_attendance(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = fields_param("date,status"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
+    selected = parse_fields(fields, AttendanceResponse)
+    employee = employee_for_user(db, current_user)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee record not found")
     
-    query = db.query(Attendance).filter(Attendance.employee_id == employee.id)
+    query = sparse_query(db, Attendance, selected) if selected else db.query(Attendance)
+    query = query.filter(Attendance.employee_id == employee.id)
     
     if start_date:
         query = query.filter(Attendance.date >= start_date)
@@ -114,6 +151,8 @@ async def get_my_attendance(
         query = query.filter(Attendance.date <= end_date)
     
     attendance_records = query.order_by(Attendance.date.desc()).all()
+    if selected:
+        return sparse_response(sparse_rows(attendance_records))
     return attendance_records
 
 @router.get("/employee/{employee_id}", response_model=List[AttendanceResponse])
@@ -121,14 +160,17 @@ async def get_employee_attendance(
     employee_id: int,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = fields_param("date,status"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+    selected = parse_fields(fields, AttendanceResponse)
+    employee = employee_by_id(db, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    query = db.query(Attendance).filter(Attendance.employee_id == employee_id)
+    query = sparse_query(db, Attendance, selected) if selected else db.query(Attendance)
+    query = query.filter(Attendance.employee_id == employee_id)
     
     if start_date:
         query = query.filter(Attendance.date >= start_date)
@@ -136,7 +178,32 @@ async def get_employee_attendance(
         query = query.filter(Attendance.date <= end_date)
     
     attendance_records = query.order_by(Attendance.date.desc()).all()
-    return attendance_records
+    # Archived years are all older than anything still in the table, so they go last
+    archived = archived_attendance(employee_id, start_date, end_date)
+    if selected:
+        return sparse_response(sparse_rows(attendance_records) + pick_fields(archived, selected))
+    return attendance_records + archived
+
+@router.get("/grid", response_model=AttendanceGrid)
+async def get_attendance_grid(
+    start_date: date,
+    end_date: date,
+    employee_ids: Optional[List[int]] = Query(None, description="Repeat for each employee, e.g. employee_ids=1&employee_ids=2"),
+    department: Optional[str] = None,
+    limit: int = Query(MAX_GRID_EMPLOYEES, ge=1, le=MAX_GRID_EMPLOYEES, description="Employees per page"),
+    after: Optional[int] = Query(None, description="Return employees after this id (next_after of the previous page)"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(require_admin)
+):
+    """Attendance of several employees (by ids and/or department) over a date range, in columns per employee"""
+    if not employee_ids and department is None:
+        raise HTTPException(status_code=400, detail="Select employees by employee_ids or department")
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+    if (end_date - start_date).days >= MAX_GRID_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_GRID_DAYS} days per grid")
+    
+    return attendance_grid(db, start_date, end_date, employee_ids, department, limit, after)
 
 @router.put("/{attendance_id}", response_model=AttendanceResponse)
 async def update_attendance(
@@ -150,9 +217,12 @@ async def update_attendance(
         raise HTTPException(status_code=404, detail="Attendance record not found")
     
     update_data = attendance_update.dict(exclude_unset=True)
+    changes = diff_changes(db_attendance, update_data)
     for field, value in update_data.items():
         setattr(db_attendance, field, value)
     
     db.commit()
     db.refresh(db_attendance)
+    invalidate_attendance_analytics()
+    audit_log.record("attendance", db_attendance.id, changes, current_user.id)
     return db_attendance
\ No newline at end of file
@@ -1,16 +1,19 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.integrity import USER_DUPLICATES, duplicate_detail
 from app.core.auth import authenticate_user, create_access_token, get_password_hash
 from app.core.config import settings
+from app.core.rate_limit import limit_login, limit_registration
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token
 
 router = APIRouter()
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_login)])
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
@@ -28,20 +31,11 @@ async def login_for_access_token(
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.post("/register", response_model=UserResponse)
+@router.post("/register", response_model=UserResponse, dependencies=[Depends(limit_registration)])
 async def register_user(
     user: UserCreate,
     db: Session = Depends(get_db)
 ):
-    db_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
-    ).first()
-    if db_user:
-        raise HTTPException(
-            status_code=400,
-            detail="Username or email already registered"
-        )
-    
     hashed_password = get_password_hash(user.password)
     db_user = User(
         username=user.username,
@@ -50,6 +44,13 @@ async def register_user(
         role=user.role
     )
     db.add(db_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        detail = duplicate_detail(e, USER_DUPLICATES)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail)
     db.refresh(db_user)
     return db_user
\ No newline at end of file
@@ -0,0 +1,98 @@
+import json
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from app.core.auth import get_current_active_user
+from app.core.database import get_db
+from app.models.user import User
+from app.schemas.batch import BatchItem, BatchRequest, BatchResponse
+
+router = APIRouter()
+
+MAX_BATCH_REQUESTS = 20
+NOT_BATCHABLE = "Only endpoints that return JSON can be batched"
+
+class _NotJSON(Exception):
+    pass
+
+def _sub_scope(scope: dict, item: BatchItem, body: bytes, db: Session, user: User) -> dict:
+    url = urlsplit(item.path)
+    headers = [(name, value) for name, value in scope["headers"] if name in (b"authorization", b"accept")]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    return {
+        **scope,
+        "method": item.method,
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        # Shared with get_db, get_read_db and get_current_user so the sub-request reuses both
+        "state": {"batch_db": db, "batch_user": user},
+    }
+
+async def _run(request: Request, item: BatchItem, db: Session, user: User) -> dict:
+    body = json.dumps(item.body).encode() if item.body is not None else b""
+    scope = _sub_scope(request.scope, item, body, db, user)
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await request.receive()
+
+    status_code = 500
+    chunks = []
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"application/json")
+            if b"json" not in content_type:
+                # A stream would never finish the batch; stop any non-JSON response before its body
+                raise _NotJSON()
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        # Straight to the router: the batch request itself already went through the middleware
+        await request.app.router(scope, receive, send)
+    except StarletteHTTPException as exc:
+        # Raised by the router itself for unknown paths and methods
+        return {"id": item.id, "status": exc.status_code, "body": {"detail": exc.detail}}
+    except _NotJSON:
+        return {"id": item.id, "status": 400, "body": {"detail": NOT_BATCHABLE}}
+    except Exception:
+        db.rollback()
+        return {"id": item.id, "status": 500, "body": {"detail": "Internal Server Error"}}
+
+    raw = b"".join(chunks)
+    try:
+        payload = json.loads(raw) if raw else None
+    except ValueError:
+        payload = raw.decode("utf-8", "replace")
+    return {"id": item.id, "status": status_code, "body": payload}
+
+@router.post("/", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Run several API requests in one round trip, one authentication and one database session.
+
+    The requests run one after another, in order: they share the session, which must never be
+    used by two of them at once (routes may hand it to a worker thread).
+    """
+    if len(batch.requests) > MAX_BATCH_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_REQUESTS} requests per batch")
+    for item in batch.requests:
+        if not item.path.startswith("/api/") or urlsplit(item.path).path.rstrip("/") == "/api/batch":
+            raise HTTPException(status_code=400, detail=f"Unsupported path in batch: {item.path}")
+
+    return {"responses": [await _run(request, item, db, current_user) for item in batch.requests]}
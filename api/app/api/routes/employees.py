@@ -1,34 +1,55 @@
-from typing import List
+from typing import List, Optional
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from app.core.database import get_db
+from sqlalchemy.orm import Session
+from app.core.replicas import get_read_db
 from app.core.auth import get_current_active_user
+from app.core.lookups import employee_for_user
 from app.models.user import User
-from app.models.employee import Employee
 from app.models.salary import SalaryRecord
 from app.schemas.employee import EmployeeResponse
 from app.schemas.salary import SalaryRecordResponse
+from app.schemas.payroll import PayrollMonth
+from app.services.payroll_service import ARCHIVED_YEARS_DETAIL, archived_payroll_years, payroll_by_month
 
 router = APIRouter()
 
 @router.get("/me", response_model=EmployeeResponse)
 async def get_my_employee_data(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    employee = db.query(Employee).options(joinedload(Employee.user)).filter(Employee.user_id == current_user.id).first()
+    employee = employee_for_user(db, current_user)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee record not found")
     return employee
 
 @router.get("/me/salary-records", response_model=List[SalaryRecordResponse])
 async def get_my_salary_records(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    employee = db.query(Employee).filter(Employee.user_id == current_user.id).first()
+    employee = employee_for_user(db, current_user)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee record not found")
     
-    salary_records = db.query(SalaryRecord).filter(SalaryRecord.employee_id == employee.id).all()
-    return salary_records
\ No newline at end of file
+    salary_records = db.query(SalaryRecord).filter(SalaryRecord.employee_id == employee.id).order_by(
+        SalaryRecord.year, SalaryRecord.month
+    ).all()
+    return salary_records
+
+@router.get("/me/payroll", response_model=List[PayrollMonth])
+async def get_my_payroll(
+    year: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Monthly pay of the year (default: current) with year-to-date totals and the change from the previous month"""
+    employee = employee_for_user(db, current_user)
+    if not employee:
+        raise HTTPException(status_code=404, detail="Employee record not found")
+    
+    year = year or date.today().year
+    if archived_payroll_years(year, year):
+        raise HTTPException(status_code=400, detail=ARCHIVED_YEARS_DETAIL.format(years=year))
+    return payroll_by_month(db, year, year, group_by="employee", employee_id=employee.id)
\ No newline at end of file
@@ -1,15 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.integrity import ACCOUNT_DUPLICATES, duplicate_detail
+from app.core.lookups import invalidate_invitation, invitation_by_token
 from app.core.auth import get_password_hash
+from app.core.rate_limit import limit_invitation_token
 from app.models.user import User, UserRole
 from app.models.employee import Employee
 from app.models.invitation import Invitation, InvitationStatus
 from app.schemas.invitation import InvitationAccept, InvitationAcceptResponse
+from app.services.search_service import invalidate_employee_search
 
 router = APIRouter()
 
-@router.post("/accept", response_model=InvitationAcceptResponse)
+@router.post("/accept", response_model=InvitationAcceptResponse, dependencies=[Depends(limit_invitation_token)])
 async def accept_invitation(
     invitation_data: InvitationAccept,
     db: Session = Depends(get_db)
@@ -23,16 +28,7 @@ async def accept_invitation(
     if not invitation.is_valid:
         raise HTTPException(status_code=400, detail="Invitation has expired or already been used")
     
-    # Check if username already exists
-    existing_user = db.query(User).filter(User.username == invitation_data.username).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username already exists")
-    
-    # Check if user with invitation email already exists
-    existing_user_email = db.query(User).filter(User.email == invitation.email).first()
-    if existing_user_email:
-        raise HTTPException(status_code=400, detail="User with this email already exists")
-    
+    # Taken usernames and emails are rejected by the unique constraints when the account is inserted
     try:
         # Create user account
         hashed_password = get_password_hash(invitation_data.password)
@@ -67,6 +63,8 @@ async def accept_invitation(
         db.commit()
         db.refresh(db_user)
         db.refresh(db_employee)
+        invalidate_invitation(invitation.token)
+        invalidate_employee_search()
         
         return InvitationAcceptResponse(
             message="Invitation accepted successfully. Your account has been created.",
@@ -74,17 +72,24 @@ async def accept_invitation(
             employee_id=db_employee.id
         )
     
+    except IntegrityError as e:
+        db.rollback()
+        detail = duplicate_detail(e, ACCOUNT_DUPLICATES)
+        if detail is None:
+            raise HTTPException(status_code=500, detail="Failed to create account")
+        raise HTTPException(status_code=400, detail=detail)
+    
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to create account")
 
-@router.get("/validate/{token}")
+@router.get("/validate/{token}", dependencies=[Depends(limit_invitation_token)])
 async def validate_invitation_token(
     token: str,
     db: Session = Depends(get_db)
 ):
     """Validate if an invitation token is valid and return basic invitation info"""
-    invitation = db.query(Invitation).filter(Invitation.token == token).first()
+    invitation = invitation_by_token(db, token)
     if not invitation:
         raise HTTPException(status_code=404, detail="Invalid invitation token")
     
@@ -0,0 +1,260 @@
+import json
+import logging
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Small thread-safe in-process LRU cache with an optional per-entry TTL"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+INVALIDATION_CHANNEL = "cache_invalidations"
+# Keys per invalidation message, which keeps NOTIFY payloads under Postgres' 8000 byte limit
+INVALIDATION_BATCH = 100
+
+class MemoryCacheBackend:
+    """Shared tier inside one process, a stand-in for a single worker and tests"""
+
+    shared = False
+
+    def __init__(self, url: Optional[str], on_invalidate: Callable[[List[str]], None]):
+        self.on_invalidate = on_invalidate
+        self._entries = LRUCache(maxsize=100_000)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._entries.set(key, value, ttl)
+
+    def invalidate(self, keys: List[str]):
+        for key in keys:
+            self._entries.delete(key)
+        self.on_invalidate(keys)
+
+class PostgresCacheBackend:
+    """No shared entries; invalidations reach every worker through LISTEN/NOTIFY"""
+
+    shared = True
+
+    def __init__(self, url: Optional[str], on_invalidate: Callable[[List[str]], None]):
+        # Imported here so modules that only need LRUCache stay cheap to import
+        from app.core.events import PostgresEventBackend
+        self._bus = PostgresEventBackend(lambda message: on_invalidate(message["keys"]), INVALIDATION_CHANNEL)
+
+    def start(self):
+        self._bus.start()
+
+    def stop(self):
+        self._bus.stop()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        pass
+
+    def invalidate(self, keys: List[str]):
+        self._bus.publish({"keys": keys})
+
+def _redis():
+    try:
+        import redis
+    except ImportError as exc:
+        raise RuntimeError("CACHE_BACKEND=redis needs the redis package: install the 'cache' extra") from exc
+    return redis
+
+class RedisCacheBackend:
+    """Entries and invalidations shared through Redis; CACHE_URL may be redis:// or a unix:// socket"""
+
+    shared = True
+    poll_seconds = 1.0
+
+    def __init__(self, url: Optional[str], on_invalidate: Callable[[List[str]], None]):
+        if not url:
+            raise RuntimeError("CACHE_BACKEND=redis needs CACHE_URL")
+        self.client = _redis().Redis.from_url(url)
+        self.on_invalidate = on_invalidate
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name=INVALIDATION_CHANNEL, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds * 2)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(key, value, px=int(ttl * 1000))
+
+    def invalidate(self, keys: List[str]):
+        self.client.delete(*keys)
+        self.client.publish(INVALIDATION_CHANNEL, json.dumps({"keys": keys}))
+
+    def _listen(self):
+        while not self._stop.is_set():
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=self.poll_seconds)
+                    if message is not None:
+                        self.on_invalidate(json.loads(message["data"])["keys"])
+            except Exception:
+                logger.exception("Cache invalidation listener failed, reconnecting")
+                self._stop.wait(self.poll_seconds)
+            finally:
+                pubsub.close()
+
+CACHE_BACKENDS = {"memory": MemoryCacheBackend, "postgres": PostgresCacheBackend, "redis": RedisCacheBackend}
+
+_MISSING = object()
+
+class TieredCache:
+    """Per-worker LRU in front of a shared tier, kept coherent across workers by invalidations.
+
+    A lookup checks the worker's LRU, then the shared tier, then loads from the
+    database. Concurrent misses for the same key wait for the first loader
+    instead of all querying (keys share one of LOCK_STRIPES locks). Writers call
+    invalidate() after committing: the keys are dropped here and in the shared
+    tier, and every other worker drops its copy when the message arrives. A load
+    that overlaps an invalidation is returned but not cached.
+
+    None (row not found) is never cached, so inserts need no invalidation.
+    Values are pickled into the shared tier and must be plain data. Caches kept
+    elsewhere use on_invalidate() to be cleared in every worker through the
+    same messages.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, backend: str, url: Optional[str], size: int, ttl: float, local_ttl: float):
+        self.local = LRUCache(size, local_ttl)
+        self.backend = CACHE_BACKENDS[backend](url, self._drop)
+        # Without another process to share with, entries live no longer than the local tier's
+        self.ttl = ttl if self.backend.shared else local_ttl
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        self._listeners: Dict[str, List[Callable[[], None]]] = defaultdict(list)
+
+    def start(self):
+        self.backend.start()
+
+    def stop(self):
+        self.backend.stop()
+
+    def _drop(self, keys: List[str]):
+        with self._generation_lock:
+            self._generation += 1
+        for key in keys:
+            self.local.delete(key)
+            for listener in self._listeners.get(key, ()):
+                listener()
+
+    def on_invalidate(self, key: str, listener: Callable[[], None]):
+        """Call `listener` in every worker whenever `key` is invalidated"""
+        self._listeners[key].append(listener)
+
+    def _jittered(self, ttl: float) -> float:
+        # Entries cached together don't all expire (and reload) together
+        return ttl * random.uniform(0.8, 1.0)
+
+    def _shared_get(self, key: str) -> Any:
+        try:
+            raw = self.backend.get(key)
+        except Exception:
+            logger.exception("Shared cache read failed")
+            return _MISSING
+        return _MISSING if raw is None else pickle.loads(raw)
+
+    def _shared_set(self, key: str, value: Any):
+        try:
+            self.backend.set(key, pickle.dumps(value), self._jittered(self.ttl))
+        except Exception:
+            logger.exception("Shared cache write failed")
+
+    def get_or_load(self, key: str, load: Callable[[], Any]) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._locks[hash(key) % self.LOCK_STRIPES]:
+            # Filled while waiting for the lock by the caller that loaded it
+            value = self.local.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            generation = self._generation
+            value = self._shared_get(key)
+            if value is _MISSING:
+                value = load()
+                if value is None:
+                    return None
+                if generation == self._generation:
+                    self._shared_set(key, value)
+            if generation == self._generation:
+                self.local.set(key, value, self._jittered(self.local.ttl))
+            return value
+
+    def invalidate(self, *keys: str):
+        keys = list(keys)
+        self._drop(keys)
+        for start in range(0, len(keys), INVALIDATION_BATCH):
+            try:
+                self.backend.invalidate(keys[start:start + INVALIDATION_BATCH])
+            except Exception:
+                logger.exception("Failed to publish cache invalidation")
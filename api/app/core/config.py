@@ -1,18 +1,107 @@
+from datetime import time
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     database_url: str
+    # Read replicas for GET routes, e.g. DATABASE_REPLICA_URLS='["postgresql+psycopg2://...@replica1/db"]'
+    database_replica_urls: List[str] = []
+    replica_max_lag_seconds: float = 10.0
+    replica_health_check_seconds: float = 5.0
+    read_your_writes_seconds: float = 10.0
+    # Connection pool per process; serve.py sizes these from db_max_connections
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Idempotency-Key replay store: "memory" (per worker) or "database" (shared)
+    idempotency_backend: str = "memory"
+    idempotency_ttl_seconds: int = 86400
+    idempotency_wait_seconds: float = 10.0
+    # An in-flight key whose worker stopped renewing it for this long can be taken over by a retry
+    idempotency_lease_seconds: float = 30.0
+    # Token buckets for login, registration and invitation tokens: "memory" (per worker) or "database" (shared)
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"
+    login_attempts_per_minute_per_ip: int = 20
+    login_attempts_per_minute_per_user: int = 5
+    registrations_per_minute_per_ip: int = 5
+    invitation_token_requests_per_minute_per_ip: int = 30
+    # Audit log entries are buffered and bulk-inserted every interval or once the batch fills
+    audit_batch_size: int = 500
+    audit_flush_interval_seconds: float = 1.0
+    # Monthly attendance partitions (Postgres): created this far ahead on startup and by
+    # manage_partitions.py; partitions older than the retention are detached by that script
+    attendance_partition_months_ahead: int = 3
+    attendance_retention_months: Optional[int] = None
+    # Cold archive (archive_data.py): closed years older than this many years move to
+    # compressed Parquet files under archive_dir and are read back transparently
+    archive_dir: str = "archive"
+    archive_keep_years: int = 3
+    # Live attendance stream: "memory" (per worker) or "postgres" (LISTEN/NOTIFY across workers);
+    # a subscriber with more than event_queue_size undelivered events is resent a snapshot
+    event_backend: str = "memory"
+    event_queue_size: int = 100
+    event_heartbeat_seconds: float = 15.0
+    # Workforce CSV import: rows committed per transaction (one resume checkpoint each) and
+    # threads hashing passwords (bcrypt releases the GIL; defaults to one per CPU)
+    workforce_import_batch_size: int = 500
+    workforce_hash_workers: Optional[int] = None
+    # Bulk employee updates are applied (and committed) this many rows per UPDATE statement
+    bulk_update_batch_size: int = 1000
+    # End-of-day attendance close-out (close_out_attendance.py): active employees without a record
+    # are marked ABSENT (weekdays only unless closeout_weekends) and open check-ins are closed at
+    # auto_checkout_time of their day, or auto_checkout_hours after check-in when that is set
+    attendance_closeout_weekends: bool = False
+    attendance_auto_checkout_time: time = time(17, 0)
+    attendance_auto_checkout_hours: Optional[float] = None
+    # Admin dashboard counters are reused by a worker for this long
+    dashboard_cache_seconds: float = 5.0
+    # Cache of the user, employee and invitation lookups most routes start with: a per-worker LRU
+    # in front of a shared tier. "memory" keeps both in the worker (other workers see changes after
+    # cache_local_ttl_seconds); "postgres" relays invalidations with LISTEN/NOTIFY; "redis" shares
+    # entries and invalidations through cache_url (redis://host:6379/0 or unix:///path/redis.sock)
+    cache_backend: str = "memory"
+    cache_url: Optional[str] = None
+    cache_size: int = 10000
+    cache_ttl_seconds: float = 300.0
+    cache_local_ttl_seconds: float = 5.0
+    # Analytics and payroll results for closed periods are cached per worker until an edit
+    # invalidates them (in every worker unless cache_backend is "memory"), at most this long
+    closed_period_cache_seconds: float = 600.0
+    # Readiness (/health/ready) is answered from checks a background thread runs every interval:
+    # database reachable, at least the headroom of free pool connections, audit log not backed up
+    health_check_interval_seconds: float = 5.0
+    health_check_timeout_seconds: float = 2.0
+    health_min_pool_headroom: int = 1
+    health_max_audit_backlog: int = 10000
+    # Production server (serve.py)
+    web_concurrency: Optional[int] = None
+    max_workers: int = 8
+    max_requests: int = 10000
+    graceful_timeout: int = 30
+    db_max_connections: int = 100
+    db_reserved_connections: int = 10
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+
+    # Check-ins after this time of day count as late arrivals in analytics
+    late_check_in_cutoff: time = time(9, 0)
+    # Hours worked beyond this per day are overtime, paid at base hourly rate x multiplier
+    overtime_daily_threshold_hours: float = 8.0
+    overtime_rate_multiplier: float = 1.5
+    standard_monthly_hours: float = 160.0
     
-    smtp_host: str
-    smtp_port: int
-    smtp_username: str
-    smtp_password: str
-    smtp_from_email: str
-    smtp_from_name: str
+    # Only required once an email is actually sent
+    smtp_host: Optional[str] = None
+    smtp_port: int = 587
+    smtp_username: Optional[str] = None
+    smtp_password: Optional[str] = None
+    smtp_from_email: Optional[str] = None
+    smtp_from_name: str = "Employee Management System"
+
+    @property
+    def smtp_configured(self) -> bool:
+        return bool(self.smtp_host and self.smtp_from_email)
 
     model_config = {"env_file": ".env"}
 
@@ -0,0 +1,162 @@
+"""In-process pub/sub for live attendance events with a pluggable cross-worker backend.
+
+Every subscriber gets a bounded queue. A subscriber that falls behind is not
+allowed to grow its queue: further events are dropped for it and it is
+flagged as overflowed, so the stream can resynchronise it with a fresh
+snapshot instead of replaying a backlog.
+
+With the default "memory" backend events only reach subscribers connected to
+the worker that published them; the "postgres" backend relays them through
+LISTEN/NOTIFY so every worker sees every event.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Callable, Optional, Set
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy import select as sql_select
+from app.core.config import settings
+from app.core.database import get_engine
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "attendance_events"
+
+class Subscription:
+    def __init__(self, queue_size: int, predicate: Optional[Callable[[dict], bool]] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.predicate = predicate
+        self.overflowed = False
+
+    def offer(self, event: dict):
+        if self.predicate is not None and not self.predicate(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def reset(self):
+        """Drop everything queued; called just before the subscriber is sent a fresh snapshot"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+class MemoryEventBackend:
+    def __init__(self, deliver: Callable[[dict], None]):
+        self.deliver = deliver
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def publish(self, event: dict):
+        self.deliver(event)
+
+class PostgresEventBackend:
+    """Relays events between workers with NOTIFY; each worker LISTENs on a dedicated connection"""
+
+    poll_seconds = 1.0
+
+    def __init__(self, deliver: Callable[[dict], None], channel: str = NOTIFY_CHANNEL):
+        self.deliver = deliver
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name=self.channel, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds * 2)
+
+    def publish(self, event: dict):
+        # The publishing worker receives its own notification too, so nothing is delivered locally here
+        with get_engine().connect() as connection:
+            connection.execute(sql_select(func.pg_notify(self.channel, json.dumps(event))))
+            connection.commit()
+
+    def _listen(self):
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = get_engine().raw_connection()
+                # Taken before detaching, which drops the pool record that exposes it
+                listener = connection.driver_connection
+                # Keep the LISTEN connection out of the pool for the lifetime of the worker
+                connection.detach()
+                listener.autocommit = True
+                cursor = listener.cursor()
+                cursor.execute(f"LISTEN {self.channel}")
+                cursor.close()
+                while not self._stop.is_set():
+                    for payload in self._wait(listener):
+                        self.deliver(json.loads(payload))
+            except Exception:
+                logger.exception("Listener on %s failed, reconnecting", self.channel)
+                self._stop.wait(self.poll_seconds)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def _wait(self, listener):
+        if hasattr(listener, "poll"):
+            # psycopg2
+            if select.select([listener], [], [], self.poll_seconds)[0]:
+                listener.poll()
+                while listener.notifies:
+                    yield listener.notifies.pop(0).payload
+        else:
+            # psycopg 3
+            for notify in listener.notifies(timeout=self.poll_seconds):
+                yield notify.payload
+
+class EventBroker:
+    def __init__(self, backend: str, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        backend_class = PostgresEventBackend if backend == "postgres" else MemoryEventBackend
+        self.backend = backend_class(self._deliver)
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self.backend.start()
+
+    def stop(self):
+        self.backend.stop()
+        self._loop = None
+
+    def subscribe(self, predicate: Optional[Callable[[dict], bool]] = None) -> Subscription:
+        subscription = Subscription(self.queue_size, predicate)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: dict):
+        self.backend.publish(jsonable_encoder(event))
+
+    def _deliver(self, event: dict):
+        # Backends may deliver from a listener thread; queues must only be touched on the event loop
+        if self._loop is None:
+            self._fan_out(event)
+        else:
+            self._loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event: dict):
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+
+attendance_events = EventBroker(settings.event_backend, settings.event_queue_size)
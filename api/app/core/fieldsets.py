@@ -0,0 +1,88 @@
+"""Sparse fieldsets for list endpoints: `?fields=id,first_name,department`.
+
+The requested fields become a column-projected SELECT instead of loading
+whole ORM objects, related tables are only joined when one of their fields is
+asked for, and the rows are dumped straight to JSON: they come from the
+database, so unlike the full response they are not validated again (pydantic
+still encodes decimals, enums and dates the same way).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+FieldSet = Tuple[str, ...]
+
+def fields_param(example: str):
+    return Query(
+        None,
+        description=f"Comma-separated fields to return instead of the full record, e.g. `{example}`",
+    )
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[FieldSet]:
+    """The requested fields in response-model order, or None for the full response"""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in schema.model_fields if name in requested) or None
+
+def sparse_query(
+    db: Session,
+    model,
+    fields: Iterable[str],
+    relations: Optional[Dict[str, Type[BaseModel]]] = None,
+):
+    """SELECT only the columns behind `fields`, outer-joining a relationship only when it is requested.
+
+    `relations` maps relationship fields (e.g. "user") to their nested response model;
+    their columns come back labelled `<relation>__<column>` for `sparse_rows` to fold.
+    """
+    relations = relations or {}
+    columns = []
+    joins = []
+    for name in fields:
+        if name in relations:
+            related = inspect(model).relationships[name].mapper.class_
+            columns += [getattr(related, column).label(f"{name}__{column}") for column in relations[name].model_fields]
+            joins.append(getattr(model, name))
+        else:
+            columns.append(getattr(model, name).label(name))
+    query = db.query(*columns).select_from(model)
+    for relationship in joins:
+        query = query.outerjoin(relationship)
+    return query
+
+def sparse_rows(rows) -> List[dict]:
+    """Result rows as dicts, with `<relation>__<column>` labels folded into nested dicts"""
+    keys = list(rows[0]._fields) if rows else []
+    if not any("__" in key for key in keys):
+        return [dict(zip(keys, row)) for row in rows]
+    result = []
+    for row in rows:
+        item = {}
+        for key, value in zip(keys, row):
+            if "__" in key:
+                relation, column = key.split("__", 1)
+                item.setdefault(relation, {})[column] = value
+            else:
+                item[key] = value
+        # An outer join with no match yields all NULLs: the relation is absent, not empty
+        for key, value in item.items():
+            if isinstance(value, dict) and all(column is None for column in value.values()):
+                item[key] = None
+        result.append(item)
+    return result
+
+_rows_adapter = TypeAdapter(List[Dict[str, Any]])
+
+def sparse_response(rows: List[dict]) -> Response:
+    return Response(content=_rows_adapter.dump_json(rows), media_type="application/json")
+
+def pick_fields(rows: List[dict], fields: FieldSet) -> List[dict]:
+    """Trim already-loaded dicts (e.g. archived rows) down to the requested fields"""
+    return [{name: row.get(name) for name in fields} for row in rows]
@@ -0,0 +1,162 @@
+"""Readiness checks run by a background thread and served from its last result.
+
+The load balancer polls /health/ready often and from many places. Answering
+each poll with live queries would put probe traffic on the very database the
+checks are meant to protect, and a probe stuck behind an exhausted pool would
+time out instead of reporting it. Instead a thread in each worker runs the
+checks every interval on its own single database connection, and the
+endpoint returns the cached result. A result older than a few intervals
+(the prober itself is stuck) counts as not ready.
+"""
+
+import logging
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from app.core.config import settings
+from app.core.database import get_engine
+
+logger = logging.getLogger(__name__)
+
+# Intervals after which a result no longer says anything about the worker
+STALE_AFTER_INTERVALS = 3
+
+def _probe_engine(timeout: float) -> Engine:
+    """One connection kept apart from the request pool, so probing never waits for or takes a slot in it"""
+    if settings.database_url.startswith("sqlite"):
+        connect_args = {"timeout": timeout}
+    else:
+        connect_args = {
+            "connect_timeout": max(int(timeout), 1),
+            "options": f"-c statement_timeout={int(timeout * 1000)}",
+        }
+    return create_engine(
+        settings.database_url, pool_size=1, max_overflow=0, pool_timeout=timeout, connect_args=connect_args
+    )
+
+def check_pool_headroom(min_headroom: int) -> Callable[[], dict]:
+    def check() -> dict:
+        pool = get_engine().pool
+        if not isinstance(pool, QueuePool):
+            return {}
+        capacity = pool.size() + settings.db_max_overflow
+        checked_out = pool.checkedout()
+        details = {"checked_out": checked_out, "capacity": capacity}
+        if capacity - checked_out < min_headroom:
+            raise RuntimeError(f"{checked_out} of {capacity} connections in use")
+        return details
+    return check
+
+def check_backlog(size: Callable[[], int], limit: int) -> Callable[[], dict]:
+    def check() -> dict:
+        pending = size()
+        if pending > limit:
+            raise RuntimeError(f"{pending} entries waiting, limit {limit}")
+        return {"pending": pending}
+    return check
+
+def check_smtp(timeout: float) -> Callable[[], dict]:
+    def check() -> dict:
+        if not settings.smtp_configured:
+            return {"configured": False}
+        socket.create_connection((settings.smtp_host, settings.smtp_port), timeout=timeout).close()
+        return {"configured": True}
+    return check
+
+class HealthProber:
+    def __init__(self, interval: float, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+        self._checks: List[Tuple[str, Callable[[], dict], bool]] = []
+        self._engine: Optional[Engine] = None
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, check: Callable[[], dict], critical: bool = True):
+        """Register a check: it returns details, or raises when the worker should not get traffic.
+        Non-critical checks are reported without affecting readiness."""
+        self._checks.append((name, check, critical))
+
+    def check_database(self) -> dict:
+        if self._engine is None:
+            self._engine = _probe_engine(self.timeout)
+        with self._engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return {}
+
+    def run_checks(self) -> dict:
+        checks: Dict[str, dict] = {}
+        ready = True
+        for name, check, critical in [("database", self.check_database, True)] + self._checks:
+            started = time.perf_counter()
+            try:
+                result = {"ok": True, **check()}
+            except Exception as e:
+                result = {"ok": False, "error": str(e) or type(e).__name__}
+                ready = ready and not critical
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if not critical:
+                result["critical"] = False
+            checks[name] = result
+        return {
+            "status": "ready" if ready else "not ready",
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checks": checks,
+        }
+
+    def refresh(self) -> dict:
+        with self._lock:
+            # Callers that queued behind a refresh reuse its result
+            if self._result is None or time.monotonic() - self._checked_at >= self.interval:
+                self._result = self.run_checks()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    def latest(self) -> Optional[dict]:
+        """The cached result, or None when there is no usable one.
+
+        Without a running prober (scripts, the test client without lifespan) a result
+        older than the interval is unusable and the caller refreshes it in place.
+        """
+        if self._result is None:
+            return None
+        age = time.monotonic() - self._checked_at
+        if self._thread is None:
+            return self._result if age < self.interval else None
+        if age > self.interval * STALE_AFTER_INTERVALS:
+            return {**self._result, "status": "not ready", "error": f"last check {age:.0f}s ago"}
+        return self._result
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Health checks failed to run")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="health-prober", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout * 2)
+            self._thread = None
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+health_checks = HealthProber(settings.health_check_interval_seconds, settings.health_check_timeout_seconds)
+health_checks.add("pool", check_pool_headroom(settings.health_min_pool_headroom))
+health_checks.add("smtp", check_smtp(settings.health_check_timeout_seconds), critical=False)
@@ -0,0 +1,377 @@
+"""Idempotency-Key support for mutating requests.
+
+The first request carrying a given key runs normally and its response is
+stored; retries with the same key get the stored response replayed without
+reaching the route. A retry that arrives while the first attempt is still in
+flight waits for it instead of running the business logic a second time. In
+the shared store the first attempt holds a lease on its key that it renews
+while running; a retry takes over a key whose lease lapsed because the worker
+running it died.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH = 255
+
+# Outcomes of IdempotencyStore.begin()
+NEW = "new"
+PENDING = "pending"
+DONE = "done"
+MISMATCH = "mismatch"
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+
+class MemoryIdempotencyStore:
+    """Per-process store; duplicates that land on another worker are not collapsed"""
+
+    # In-flight entries die with the process that runs them, so they need no lease
+    lease_seconds = None
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, dict] = {}
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [key for key, entry in self._entries.items() if entry["expires_at"] < now]:
+            del self._entries[key]
+
+    async def begin(self, key: str, request_hash: str) -> Tuple[str, Optional[StoredResponse]]:
+        if len(self._entries) > 10000:
+            self._prune()
+        entry = self._entries.get(key)
+        if entry is not None and entry["expires_at"] < time.monotonic():
+            entry = None
+        if entry is None:
+            self._entries[key] = {
+                "request_hash": request_hash,
+                "response": None,
+                "done": asyncio.Event(),
+                "expires_at": time.monotonic() + self.ttl_seconds,
+            }
+            return NEW, None
+        if entry["request_hash"] != request_hash:
+            return MISMATCH, None
+        if entry["response"] is None:
+            return PENDING, None
+        return DONE, entry["response"]
+
+    async def wait(self, key: str, timeout: float) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        try:
+            await asyncio.wait_for(entry["done"].wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return entry["response"]
+
+    async def complete(self, key: str, response: StoredResponse):
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry["response"] = response
+            entry["done"].set()
+
+    async def release(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry["done"].set()
+
+    async def renew(self, key: str):
+        pass
+
+def _aware(moment: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes for timezone-aware columns
+    return moment.replace(tzinfo=timezone.utc) if moment is not None and moment.tzinfo is None else moment
+
+class DatabaseIdempotencyStore:
+    """Shared store backed by the idempotency_keys table so all workers see the same keys"""
+
+    poll_interval = 0.1
+
+    def __init__(self, ttl_seconds: int, lease_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+
+    def _lease_lapsed(self, row: IdempotencyKey, now: datetime) -> bool:
+        # Keys written before leases existed have none and count as lapsed
+        return row.status_code is None and (row.locked_until is None or _aware(row.locked_until) < now)
+
+    def _take_over(self, db, key: str, request_hash: str, now: datetime) -> bool:
+        """Claim an in-flight key whose lease lapsed; only one of several racing retries succeeds"""
+        taken = db.query(IdempotencyKey).filter(
+            IdempotencyKey.key == key,
+            IdempotencyKey.request_hash == request_hash,
+            IdempotencyKey.status_code.is_(None),
+            or_(IdempotencyKey.locked_until.is_(None), IdempotencyKey.locked_until < now),
+        ).update({
+            "locked_until": now + timedelta(seconds=self.lease_seconds),
+        }, synchronize_session=False)
+        db.commit()
+        return taken == 1
+
+    def _load(self, row: IdempotencyKey) -> StoredResponse:
+        return StoredResponse(row.status_code, [tuple(h) for h in json.loads(row.headers or "[]")], row.body or b"")
+
+    def _begin(self, key: str, request_hash: str) -> Tuple[str, Optional[StoredResponse]]:
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            # Expired keys are cleaned up opportunistically rather than by a separate job
+            if random.random() < 0.01:
+                db.query(IdempotencyKey).filter(IdempotencyKey.expires_at < now).delete(synchronize_session=False)
+                db.commit()
+            for _ in range(2):
+                try:
+                    db.add(IdempotencyKey(
+                        key=key,
+                        request_hash=request_hash,
+                        locked_until=now + timedelta(seconds=self.lease_seconds),
+                        expires_at=now + timedelta(seconds=self.ttl_seconds),
+                    ))
+                    db.commit()
+                    return NEW, None
+                except IntegrityError:
+                    db.rollback()
+                row = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).first()
+                if row is None:
+                    continue
+                if _aware(row.expires_at) < now:
+                    db.delete(row)
+                    db.commit()
+                    continue
+                if row.request_hash != request_hash:
+                    return MISMATCH, None
+                if row.status_code is None:
+                    if self._lease_lapsed(row, now) and self._take_over(db, key, request_hash, now):
+                        return NEW, None
+                    return PENDING, None
+                return DONE, self._load(row)
+            return PENDING, None
+        finally:
+            db.close()
+
+    def _fetch(self, key: str) -> Tuple[bool, Optional[StoredResponse]]:
+        db = SessionLocal()
+        try:
+            row = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).first()
+            if row is None:
+                return True, None
+            if row.status_code is None:
+                # A lapsed lease will not be completed: stop waiting so the caller can take over
+                return self._lease_lapsed(row, datetime.now(timezone.utc)), None
+            return True, self._load(row)
+        finally:
+            db.close()
+
+    def _complete(self, key: str, response: StoredResponse):
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(IdempotencyKey.key == key).update({
+                "status_code": response.status_code,
+                "headers": json.dumps(response.headers),
+                "body": response.body,
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _renew(self, key: str):
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            ).update({
+                "locked_until": datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds),
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _release(self, key: str):
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(IdempotencyKey.key == key).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    async def begin(self, key: str, request_hash: str) -> Tuple[str, Optional[StoredResponse]]:
+        return await run_in_threadpool(self._begin, key, request_hash)
+
+    async def wait(self, key: str, timeout: float) -> Optional[StoredResponse]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            finished, response = await run_in_threadpool(self._fetch, key)
+            if finished:
+                return response
+        return None
+
+    async def complete(self, key: str, response: StoredResponse):
+        await run_in_threadpool(self._complete, key, response)
+
+    async def release(self, key: str):
+        await run_in_threadpool(self._release, key)
+
+    async def renew(self, key: str):
+        await run_in_threadpool(self._renew, key)
+
+def create_store():
+    if settings.idempotency_backend == "database":
+        return DatabaseIdempotencyStore(settings.idempotency_ttl_seconds, settings.idempotency_lease_seconds)
+    return MemoryIdempotencyStore(settings.idempotency_ttl_seconds)
+
+class IdempotencyMiddleware:
+    def __init__(self, app, store=None):
+        self.app = app
+        self._store = store
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = create_store()
+        return self._store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            response = JSONResponse({"detail": "Idempotency-Key is too long"}, status_code=400)
+            await response(scope, receive, send)
+            return
+
+        # Buffer the request body so it can be fingerprinted and then handed to the app
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        caller = headers.get("authorization", "")
+        key = hashlib.sha256(
+            "\n".join([caller, scope["method"], scope["path"], idempotency_key]).encode()
+        ).hexdigest()
+        request_hash = hashlib.sha256(scope.get("query_string", b"") + b"\n" + body).hexdigest()
+
+        state, stored = await self.store.begin(key, request_hash)
+        if state == PENDING:
+            stored = await self.store.wait(key, settings.idempotency_wait_seconds)
+            if stored is None:
+                # The first attempt was released or its worker died: this request may run it instead
+                state, stored = await self.store.begin(key, request_hash)
+            if state == PENDING and stored is None:
+                response = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still being processed"},
+                    status_code=409,
+                )
+                await response(scope, receive, send)
+                return
+        if state == MISMATCH:
+            response = JSONResponse(
+                {"detail": "Idempotency-Key was already used for a different request"},
+                status_code=422,
+            )
+            await response(scope, receive, send)
+            return
+        if stored is not None:
+            await self._replay(stored, send)
+            return
+
+        await self._run_first_attempt(scope, receive, send, key, body)
+
+    async def _replay(self, stored: StoredResponse, send):
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+        headers.append((REPLAYED_HEADER.encode(), b"true"))
+        await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _run_first_attempt(self, scope, receive, send, key: str, body: bytes):
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # The body is already consumed, so only disconnect messages remain
+            return await receive()
+
+        status_code = None
+        response_headers: List[Tuple[str, str]] = []
+        response_body = []
+        finished = False
+
+        async def capture_send(message):
+            nonlocal status_code, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers.extend(
+                    (name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+                if not message.get("more_body", False) and not finished:
+                    finished = True
+                    # Store as soon as the response is complete; background tasks may still be running
+                    if status_code is not None and status_code < 500:
+                        await self.store.complete(
+                            key, StoredResponse(status_code, response_headers, b"".join(response_body))
+                        )
+                    else:
+                        await self.store.release(key)
+            await send(message)
+
+        renewal = None
+        if self.store.lease_seconds:
+            renewal = asyncio.create_task(self._keep_lease(key, self.store.lease_seconds / 3))
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        finally:
+            if renewal is not None:
+                renewal.cancel()
+            if not finished:
+                await self.store.release(key)
+
+    async def _keep_lease(self, key: str, every: float):
+        while True:
+            await asyncio.sleep(every)
+            try:
+                await self.store.renew(key)
+            except Exception:
+                logger.exception("Failed to renew the lease on an idempotency key")
@@ -0,0 +1,60 @@
+"""Map unique-constraint violations back to the column that was duplicated.
+
+Writes that must not create duplicates insert directly and let the database's
+unique constraints decide, instead of checking with a SELECT first (which
+costs a round trip and still races with concurrent requests). The resulting
+IntegrityError is translated into the user-facing message for the column.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Optional
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.exc import IntegrityError
+from app.core.database import Base
+
+_SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: ([\w.]+)")
+
+@lru_cache(maxsize=1)
+def _unique_constraints() -> Dict[str, str]:
+    """Constraint or unique index name -> "table.column", from the models"""
+    names = {}
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            if index.unique and len(index.columns) == 1:
+                names[index.name] = f"{table.name}.{next(iter(index.columns)).name}"
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and len(constraint.columns) == 1:
+                column = next(iter(constraint.columns)).name
+                # Unnamed constraints get Postgres' default <table>_<column>_key name
+                names[constraint.name or f"{table.name}_{column}_key"] = f"{table.name}.{column}"
+    return names
+
+def violated_unique_column(error: IntegrityError) -> Optional[str]:
+    """"table.column" whose unique constraint the failed statement violated, if that is why it failed"""
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None:
+        # psycopg 2 and 3 report the constraint by name
+        return _unique_constraints().get(diag.constraint_name)
+    match = _SQLITE_UNIQUE.search(str(error.orig))
+    return match.group(1) if match else None
+
+def duplicate_detail(error: IntegrityError, messages: Dict[str, str]) -> Optional[str]:
+    """The message for the duplicated column, or None when the error is something else"""
+    return messages.get(violated_unique_column(error))
+
+USER_DUPLICATES = {
+    "users.username": "Username or email already registered",
+    "users.email": "Username or email already registered",
+}
+
+INVITATION_DUPLICATES = {
+    "invitations.email": "Pending invitation already exists for this email",
+    "invitations.employee_id": "Employee ID already exists in pending invitations",
+}
+
+ACCOUNT_DUPLICATES = {
+    "users.username": "Username already exists",
+    "users.email": "User with this email already exists",
+    "employees.employee_id": "Employee ID already exists",
+}
@@ -0,0 +1,85 @@
+"""Cached lookups of the user, employee and invitation rows most routes start with.
+
+Rows are cached as plain column values and attached to the caller's session
+with merge(load=False), so a hit costs no query and the returned object behaves
+like a freshly loaded one: relationships load lazily and changes are flushed on
+commit. Code that changes these rows calls the matching invalidate_* function
+after committing; inserts need nothing, as a missing row is never cached.
+"""
+
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.core.database import SessionLocal, get_engine
+from app.models.employee import Employee
+from app.models.invitation import Invitation
+from app.models.user import User
+
+lookup_cache = TieredCache(
+    settings.cache_backend,
+    settings.cache_url,
+    settings.cache_size,
+    settings.cache_ttl_seconds,
+    settings.cache_local_ttl_seconds,
+)
+
+# Left out of the cache and loaded on access; only login reads the hash
+UNCACHED_COLUMNS = {User: {"hashed_password"}}
+
+def _columns(obj) -> dict:
+    skip = UNCACHED_COLUMNS.get(type(obj), set())
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs if attr.key not in skip}
+
+def _lookup(db: Session, model, key: str, *criteria):
+    def load():
+        # Always from the primary: a lagging replica could re-cache a row right after its invalidation
+        source = db if db.get_bind() is get_engine() else SessionLocal()
+        try:
+            obj = source.query(model).filter(*criteria).first()
+            return None if obj is None else _columns(obj)
+        finally:
+            if source is not db:
+                source.close()
+
+    columns = lookup_cache.get_or_load(key, load)
+    if columns is None:
+        return None
+    obj = model(**columns)
+    make_transient_to_detached(obj)
+    # Returns the session's own instance when the row is already loaded in it
+    return db.merge(obj, load=False)
+
+def user_by_username(db: Session, username: str) -> Optional[User]:
+    return _lookup(db, User, f"user:username:{username}", User.username == username)
+
+def user_by_id(db: Session, user_id: int) -> Optional[User]:
+    return _lookup(db, User, f"user:id:{user_id}", User.id == user_id)
+
+def employee_by_id(db: Session, employee_id: int) -> Optional[Employee]:
+    return _lookup(db, Employee, f"employee:id:{employee_id}", Employee.id == employee_id)
+
+def employee_for_user(db: Session, user: User) -> Optional[Employee]:
+    """The employee record of `user`, with `employee.user` set to it without a query"""
+    employee = _lookup(db, Employee, f"employee:user:{user.id}", Employee.user_id == user.id)
+    if employee is not None:
+        set_committed_value(employee, "user", db.merge(user, load=False))
+    return employee
+
+def invitation_by_token(db: Session, token: str) -> Optional[Invitation]:
+    return _lookup(db, Invitation, f"invitation:token:{token}", Invitation.token == token)
+
+def invalidate_user(user_id: int, username: str):
+    lookup_cache.invalidate(f"user:id:{user_id}", f"user:username:{username}")
+
+def invalidate_employees(employees: Iterable[Tuple[int, int]]):
+    """Forget employees given as (id, user_id) pairs"""
+    keys = []
+    for employee_id, user_id in employees:
+        keys += [f"employee:id:{employee_id}", f"employee:user:{user_id}"]
+    lookup_cache.invalidate(*keys)
+
+def invalidate_invitation(token: str):
+    lookup_cache.invalidate(f"invitation:token:{token}")
@@ -0,0 +1,129 @@
+"""Token-bucket rate limiting for credential and token endpoints.
+
+Limits are checked in dependencies that run before the route body, so a
+rejected request never reaches bcrypt or the database.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Tuple
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import func
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.rate_limit import RateLimitBucket
+
+class MemoryRateLimitBackend:
+    """Per-process buckets stored as (tokens, updated_at) tuples"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+    def _prune(self, now: float, max_idle: float):
+        for key in [key for key, (_, updated_at) in self._buckets.items() if now - updated_at > max_idle]:
+            del self._buckets[key]
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        """Take one token; returns 0 when allowed, otherwise seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_prune:
+                # A bucket idle for capacity / rate seconds is full again, so forgetting it is lossless
+                self._prune(now, capacity / rate)
+                self._next_prune = now + 60
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+
+class DatabaseRateLimitBackend:
+    """Buckets shared by all workers, updated with one atomic upsert per check"""
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        now = time.time()
+        db = SessionLocal()
+        try:
+            dialect = db.get_bind().dialect.name
+            # Only the dialect in use is loaded, and only once a request is rate limited
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+                least = func.least
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+                least = func.min
+            refilled = least(capacity, RateLimitBucket.tokens + (now - RateLimitBucket.updated_at) * rate)
+
+            # Only a granted request moves updated_at to now; a rejected one leaves the row untouched
+            statement = insert(RateLimitBucket).values(key=key, tokens=capacity - 1, updated_at=now)
+            statement = statement.on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={"tokens": refilled - 1, "updated_at": now},
+                where=refilled >= 1,
+            ).returning(RateLimitBucket.tokens, RateLimitBucket.updated_at)
+            granted = db.execute(statement).first() is not None
+
+            if not granted:
+                tokens, updated_at = db.query(RateLimitBucket.tokens, RateLimitBucket.updated_at).filter(
+                    RateLimitBucket.key == key
+                ).one()
+            elif random.random() < 0.01:
+                # A bucket idle for capacity / rate seconds is full again, so deleting it is lossless
+                db.query(RateLimitBucket).filter(
+                    RateLimitBucket.updated_at < now - capacity / rate
+                ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+        if granted:
+            return 0.0
+        return (1 - min(capacity, tokens + (now - updated_at) * rate)) / rate
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_rate_limit_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.rate_limit_backend == "database":
+                    _backend = DatabaseRateLimitBackend()
+                else:
+                    _backend = MemoryRateLimitBackend()
+    return _backend
+
+def set_rate_limit_backend(backend):
+    global _backend
+    _backend = backend
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+def enforce(scope: str, identity: str, per_minute: int):
+    if not settings.rate_limit_enabled or per_minute <= 0:
+        return
+    retry_after = get_rate_limit_backend().take(f"{scope}:{identity}", per_minute, per_minute / 60.0)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(max(int(retry_after + 0.999), 1))},
+        )
+
+def limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    enforce("login-ip", client_ip(request), settings.login_attempts_per_minute_per_ip)
+    enforce("login-user", form_data.username.lower(), settings.login_attempts_per_minute_per_user)
+
+def limit_registration(request: Request):
+    enforce("register-ip", client_ip(request), settings.registrations_per_minute_per_ip)
+
+def limit_invitation_token(request: Request):
+    enforce("invitation-ip", client_ip(request), settings.invitation_token_requests_per_minute_per_ip)
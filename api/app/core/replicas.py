@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+class ReplicaPool:
+    """Round-robin over read replicas, skipping ones that are down or lagging"""
+
+    def __init__(self, urls: List[str], max_lag_seconds: float, health_check_seconds: float):
+        self.engines = [
+            create_engine(
+                url,
+                pool_pre_ping=True,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+            )
+            for url in urls
+        ]
+        self.sessions = {engine: sessionmaker(autocommit=False, autoflush=False, bind=engine) for engine in self.engines}
+        self.max_lag_seconds = max_lag_seconds
+        self.health_check_seconds = health_check_seconds
+        self._healthy: Dict[Engine, bool] = {engine: True for engine in self.engines}
+        self._checked_at: Dict[Engine, float] = {engine: 0.0 for engine in self.engines}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _replication_lag(self, replica: Engine) -> float:
+        if replica.dialect.name != "postgresql":
+            return 0.0
+        with replica.connect() as connection:
+            lag = connection.execute(text(
+                "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+            )).scalar()
+        return float(lag or 0)
+
+    def _is_healthy(self, replica: Engine) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at[replica] < self.health_check_seconds:
+            return self._healthy[replica]
+        self._checked_at[replica] = now
+        try:
+            self._healthy[replica] = self._replication_lag(replica) <= self.max_lag_seconds
+        except SQLAlchemyError:
+            self._healthy[replica] = False
+        return self._healthy[replica]
+
+    def mark_down(self, replica: Engine):
+        self._healthy[replica] = False
+        self._checked_at[replica] = time.monotonic()
+
+    def pick(self) -> Optional[Engine]:
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.engines)
+        for offset in range(len(self.engines)):
+            replica = self.engines[(start + offset) % len(self.engines)]
+            if self._is_healthy(replica):
+                return replica
+        return None
+
+    def dispose(self):
+        for replica in self.engines:
+            replica.dispose()
+
+_replicas: Optional[ReplicaPool] = None
+_replicas_lock = threading.Lock()
+
+def get_replicas() -> Optional[ReplicaPool]:
+    global _replicas
+    if _replicas is None and settings.database_replica_urls:
+        with _replicas_lock:
+            if _replicas is None:
+                _replicas = ReplicaPool(
+                    settings.database_replica_urls,
+                    settings.replica_max_lag_seconds,
+                    settings.replica_health_check_seconds,
+                )
+    return _replicas
+
+# Authorization header -> monotonic time of that caller's last successful write
+_recent_writes: Dict[str, float] = {}
+
+def mark_recent_write(request: Request):
+    key = request.headers.get("authorization")
+    if not settings.database_replica_urls or not key:
+        return
+    now = time.monotonic()
+    if len(_recent_writes) > 10000:
+        for stale in [k for k, at in _recent_writes.items() if now - at > settings.read_your_writes_seconds]:
+            _recent_writes.pop(stale, None)
+    _recent_writes[key] = now
+
+def _reads_from_primary(request: Request) -> bool:
+    if request.headers.get(READ_PRIMARY_HEADER):
+        return True
+    key = request.headers.get("authorization")
+    last_write = _recent_writes.get(key) if key else None
+    if last_write is None:
+        return False
+    if time.monotonic() - last_write > settings.read_your_writes_seconds:
+        _recent_writes.pop(key, None)
+        return False
+    return True
+
+def get_read_db(request: Request):
+    """Session for read-only routes, served by a replica when one is configured and healthy"""
+    shared = getattr(request.state, "batch_db", None)
+    if shared is not None:
+        yield shared
+        return
+    db = None
+    replicas = get_replicas()
+    if replicas is not None and not _reads_from_primary(request):
+        replica = replicas.pick()
+        if replica is not None:
+            db = replicas.sessions[replica]()
+            try:
+                db.connection()
+            except SQLAlchemyError:
+                db.close()
+                replicas.mark_down(replica)
+                db = None
+    if db is None:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
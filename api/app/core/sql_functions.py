@@ -0,0 +1,96 @@
+"""Portable SQL expressions for date/time arithmetic.
+
+Postgres is the production database; the SQLite variants keep the same queries
+usable against a local SQLite file.
+"""
+
+from sqlalchemy import Date, DateTime, Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+class epoch_seconds(FunctionElement):
+    """Seconds since 1970-01-01 for a DATE or naive TIMESTAMP value"""
+    type = Float()
+    inherit_cache = True
+    name = "epoch_seconds"
+
+@compiles(epoch_seconds)
+def _epoch_seconds_default(element, compiler, **kw):
+    return "EXTRACT(EPOCH FROM %s)" % compiler.process(element.clauses, **kw)
+
+@compiles(epoch_seconds, "sqlite")
+def _epoch_seconds_sqlite(element, compiler, **kw):
+    return "CAST(strftime('%%s', %s) AS REAL)" % compiler.process(element.clauses, **kw)
+
+class seconds_of_day(FunctionElement):
+    """Seconds since midnight for a naive TIMESTAMP value"""
+    type = Float()
+    inherit_cache = True
+    name = "seconds_of_day"
+
+@compiles(seconds_of_day)
+def _seconds_of_day_default(element, compiler, **kw):
+    return "EXTRACT(EPOCH FROM CAST(%s AS TIME))" % compiler.process(element.clauses, **kw)
+
+@compiles(seconds_of_day, "sqlite")
+def _seconds_of_day_sqlite(element, compiler, **kw):
+    timestamp = compiler.process(element.clauses, **kw)
+    return "CAST(strftime('%%s', %s) - strftime('%%s', date(%s)) AS REAL)" % (timestamp, timestamp)
+
+class plus_seconds(FunctionElement):
+    """A DATE or naive TIMESTAMP value moved by a number of seconds, as a naive TIMESTAMP"""
+    type = DateTime()
+    inherit_cache = True
+    name = "plus_seconds"
+
+@compiles(plus_seconds)
+def _plus_seconds_default(element, compiler, **kw):
+    value, seconds = list(element.clauses)
+    return "CAST(%s AS TIMESTAMP) + %s * INTERVAL '1 second'" % (
+        compiler.process(value, **kw), compiler.process(seconds, **kw)
+    )
+
+@compiles(plus_seconds, "sqlite")
+def _plus_seconds_sqlite(element, compiler, **kw):
+    value, seconds = list(element.clauses)
+    return "datetime(%s, '+' || (%s) || ' seconds')" % (
+        compiler.process(value, **kw), compiler.process(seconds, **kw)
+    )
+
+class period_start(FunctionElement):
+    """First day of the day/week/month/year containing a DATE value"""
+    type = Date()
+    # The unit is rendered literally, so statements using this must not share a cache entry
+    inherit_cache = False
+    name = "period_start"
+
+PERIODS = ("day", "week", "month", "year")
+
+def _period(element):
+    date_clause, unit_clause = list(element.clauses)
+    unit = unit_clause.value
+    if unit not in PERIODS:
+        raise ValueError(f"Unsupported period: {unit}")
+    return date_clause, unit
+
+@compiles(period_start)
+def _period_start_default(element, compiler, **kw):
+    date_clause, unit = _period(element)
+    return "CAST(date_trunc('%s', %s) AS DATE)" % (unit, compiler.process(date_clause, **kw))
+
+@compiles(period_start, "sqlite")
+def _period_start_sqlite(element, compiler, **kw):
+    date_clause, unit = _period(element)
+    modifiers = {
+        "day": "",
+        "week": ", 'weekday 0', '-6 days'",
+        "month": ", 'start of month'",
+        "year": ", 'start of year'",
+    }[unit]
+    return "date(%s%s)" % (compiler.process(date_clause, **kw), modifiers)
+
+def hours_between(start, end):
+    return (epoch_seconds(end) - epoch_seconds(start)) / 3600.0
+
+def day_number(date):
+    return epoch_seconds(date) / 86400
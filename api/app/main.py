@@ -1,14 +1,67 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import auth, employees, attendance, admin, invitations
+from app.api.routes import auth, employees, attendance, admin, invitations, analytics, batch
 from app.core.config import settings
+from app.core.database import SessionLocal, get_engine
+from app.core.events import attendance_events
+from app.core.health import check_backlog, health_checks
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.lookups import lookup_cache
+from app.core.replicas import get_replicas, mark_recent_write
+from app.services.audit_service import audit_log
+from app.services.partition_service import ensure_future_attendance_partitions
+
+# Audit entries pile up in memory when flushes keep failing
+health_checks.add("audit_backlog", check_backlog(audit_log.backlog, settings.health_max_audit_backlog))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open database pools when the worker starts rather than at import time
+    get_engine()
+    get_replicas()
+    db = SessionLocal()
+    try:
+        ensure_future_attendance_partitions(db, settings.attendance_partition_months_ahead)
+    finally:
+        db.close()
+    audit_log.start()
+    attendance_events.start()
+    lookup_cache.start()
+    health_checks.start()
+    yield
+    health_checks.stop()
+    lookup_cache.stop()
+    attendance_events.stop()
+    # Write out buffered audit entries before the pools go away
+    await audit_log.stop()
+    replicas = get_replicas()
+    if replicas is not None:
+        replicas.dispose()
+    get_engine().dispose()
 
 app = FastAPI(
     title="Employee Management API",
     description="API for managing employees, attendance, and payroll",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Starlette runs the middleware added last outermost. From the outside in: CORS (so it also
+# covers replayed responses), track_recent_writes (so a replayed write still pins the caller to
+# the primary), idempotency, then the routes, whose rate limits are route dependencies
+app.add_middleware(IdempotencyMiddleware)
+
+@app.middleware("http")
+async def track_recent_writes(request: Request, call_next):
+    response = await call_next(request)
+    # Pin the caller to the primary for a while so replica lag can't hide their own change
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        mark_recent_write(request)
+    return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -22,11 +75,23 @@ app.include_router(employees.router, prefix="/api/employees", tags=["employees"]
 app.include_router(attendance.router, prefix="/api/attendance", tags=["attendance"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 app.include_router(invitations.router, prefix="/api/invitations", tags=["invitations"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(batch.router, prefix="/api/batch", tags=["batch"])
 
 @app.get("/")
 async def root():
     return {"message": "Employee Management API", "version": "1.0.0"}
 
-@app.get("/health")
+@app.get("/health/live")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    # Liveness: the worker answers requests; dependencies are for readiness
+    return {"status": "healthy"}
+
+# /health is what load balancers already poll, so it must stop routing to a broken worker
+@app.get("/health")
+@app.get("/health/ready")
+async def readiness_check():
+    result = health_checks.latest()
+    if result is None:
+        result = await run_in_threadpool(health_checks.refresh)
+    return JSONResponse(result, status_code=200 if result["status"] == "ready" else 503)
@@ -3,5 +3,9 @@ from .employee import Employee
 from .attendance import Attendance
 from .salary import SalaryRecord
 from .invitation import Invitation
+from .idempotency import IdempotencyKey
+from .rate_limit import RateLimitBucket
+from .audit import AuditLog
+from .calendar import CalendarOperation
 
-__all__ = ["User", "Employee", "Attendance", "SalaryRecord", "Invitation"]
\ No newline at end of file
+__all__ = ["User", "Employee", "Attendance", "SalaryRecord", "Invitation", "IdempotencyKey", "RateLimitBucket", "AuditLog", "CalendarOperation"]
\ No newline at end of file
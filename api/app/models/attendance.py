@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Date, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, DateTime, Date, ForeignKey, Enum, Index, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -12,9 +12,10 @@ class AttendanceStatus(enum.Enum):
     SICK_LEAVE = "sick_leave"
     VACATION = "vacation"
 
+LEAVE_STATUSES = (AttendanceStatus.LEAVE, AttendanceStatus.SICK_LEAVE, AttendanceStatus.VACATION)
+
 class Attendance(Base):
     __tablename__ = "attendance"
-
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
     date = Column(Date, nullable=False)
@@ -22,7 +23,17 @@ class Attendance(Base):
     check_out_time = Column(DateTime)
     status = Column(Enum(AttendanceStatus), nullable=False)
     notes = Column(Text)
+    # Set on rows created by an admin calendar operation so the operation can be undone
+    calendar_operation_id = Column(Integer, ForeignKey("calendar_operations.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    employee = relationship("Employee", back_populates="attendances")
\ No newline at end of file
+    employee = relationship("Employee", back_populates="attendances")
+
+    # On Postgres the table is range-partitioned by month on `date` with primary key (id, date),
+    # see app.services.partition_service. Mapping the same key makes ORM UPDATE/DELETE filter on
+    # date too, so they touch one partition instead of probing every partition's id index.
+    __table_args__ = (
+        Index("uq_attendance_employee_date", "employee_id", "date", unique=True),
+    )
+    __mapper_args__ = {"primary_key": [id, date]}
\ No newline at end of file
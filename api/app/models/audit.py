@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, JSON
+from app.core.database import Base
+
+class AuditLog(Base):
+    __tablename__ = "audit_log"
+
+    id = Column(Integer, primary_key=True)
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    changed_by = Column(Integer, ForeignKey("users.id"))
+    # {"field": [old, new], ...} for the fields that actually changed
+    changes = Column(JSON, nullable=False)
+    # Time of the change, set when the entry is recorded rather than when the buffer is flushed
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_audit_log_entity", "entity_type", "entity_id", "id"),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Enum
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.attendance import AttendanceStatus
+
+class CalendarOperation(Base):
+    """One company-wide (or department-wide) status applied across a date range"""
+    __tablename__ = "calendar_operations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(Enum(AttendanceStatus), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    # NULL applies to every department
+    department = Column(String)
+    include_weekends = Column(Boolean, nullable=False, default=True)
+    records_created = Column(Integer, nullable=False, default=0)
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    undone_at = Column(DateTime(timezone=True))
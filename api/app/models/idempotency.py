@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of caller + method + path + Idempotency-Key header
+    key = Column(String(64), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    # NULL while the first request is still in flight
+    status_code = Column(Integer)
+    headers = Column(Text)
+    body = Column(LargeBinary)
+    # Renewed by the worker running the first request; once it lapses a retry takes the key over
+    locked_until = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
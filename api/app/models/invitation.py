@@ -5,6 +5,8 @@ import enum
 from datetime import datetime, timedelta, timezone
 import secrets
 
+INVITATION_EXPIRY = timedelta(days=7)
+
 class InvitationStatus(enum.Enum):
     PENDING = "pending"
     ACCEPTED = "accepted"
@@ -35,7 +37,7 @@ class Invitation(Base):
         if not self.token:
             self.token = secrets.token_urlsafe(32)
         if not self.expires_at:
-            self.expires_at = datetime.now(timezone.utc) + timedelta(days=7)  # 7 days expiry
+            self.expires_at = datetime.now(timezone.utc) + INVITATION_EXPIRY
 
     @property
     def is_expired(self):
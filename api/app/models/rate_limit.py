@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Float, String
+from app.core.database import Base
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Unix time of the last refill; rows idle long enough to be full again are deleted
+    updated_at = Column(Float, nullable=False, index=True)
@@ -1,13 +1,33 @@
 from .user import UserCreate, UserResponse, Token, TokenData
-from .employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse
-from .attendance import AttendanceCreate, AttendanceUpdate, AttendanceResponse
+from .employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse, EmployeeSearchResult, EmployeeBulkFilter, EmployeeBulkChange, EmployeeBulkUpdate, EmployeeBulkUpdatePreview, EmployeeBulkUpdated, EmployeeBulkUpdateResponse
+from .attendance import AttendanceCreate, AttendanceUpdate, AttendanceResponse, AttendanceGrid, AttendanceGridEmployee
 from .salary import SalaryRecordCreate, SalaryRecordUpdate, SalaryRecordResponse
-from .invitation import InvitationCreate, InvitationResponse, InvitationAccept, InvitationAcceptResponse
+from .invitation import InvitationCreate, InvitationResponse, InvitationAccept, InvitationAcceptResponse, InvitationBulkError, InvitationBulkResponse
+from .analytics import DepartmentAttendanceStats, AbsenceStreak
+from .work_hours import WorkHoursSummary, OvertimeApplyResponse
+from .audit import AuditLogEntry, AuditLogPage
+from .batch import BatchItem, BatchRequest, BatchItemResponse, BatchResponse
+from .dashboard import DashboardSummary
+from .calendar import AttendanceCloseOutResponse, CalendarOperationCreate, CalendarOperationPreview, CalendarOperationResponse, CalendarUndoResponse
+from .payroll import PayrollTotals, PayrollMonth, PayrollYear
+from .workforce import WorkforceImportRow, WorkforceImportError, WorkforceCredential, WorkforceImportResponse
 
 __all__ = [
     "UserCreate", "UserResponse", "Token", "TokenData",
-    "EmployeeCreate", "EmployeeUpdate", "EmployeeResponse",
-    "AttendanceCreate", "AttendanceUpdate", "AttendanceResponse",
+    "EmployeeCreate", "EmployeeUpdate", "EmployeeResponse", "EmployeeSearchResult",
+    "EmployeeBulkFilter", "EmployeeBulkChange", "EmployeeBulkUpdate", "EmployeeBulkUpdatePreview",
+    "EmployeeBulkUpdated", "EmployeeBulkUpdateResponse",
+    "AttendanceCreate", "AttendanceUpdate", "AttendanceResponse", "AttendanceGrid", "AttendanceGridEmployee",
     "SalaryRecordCreate", "SalaryRecordUpdate", "SalaryRecordResponse",
-    "InvitationCreate", "InvitationResponse", "InvitationAccept", "InvitationAcceptResponse"
+    "InvitationCreate", "InvitationResponse", "InvitationAccept", "InvitationAcceptResponse",
+    "InvitationBulkError", "InvitationBulkResponse",
+    "DepartmentAttendanceStats", "AbsenceStreak",
+    "WorkHoursSummary", "OvertimeApplyResponse",
+    "AuditLogEntry", "AuditLogPage",
+    "CalendarOperationCreate", "CalendarOperationPreview", "CalendarOperationResponse", "CalendarUndoResponse",
+    "AttendanceCloseOutResponse",
+    "DashboardSummary",
+    "BatchItem", "BatchRequest", "BatchItemResponse", "BatchResponse",
+    "PayrollTotals", "PayrollMonth", "PayrollYear",
+    "WorkforceImportRow", "WorkforceImportError", "WorkforceCredential", "WorkforceImportResponse"
 ]
\ No newline at end of file
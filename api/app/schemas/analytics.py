@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, time
+
+class DepartmentAttendanceStats(BaseModel):
+    department: Optional[str] = None
+    period_start: date
+    employees: int
+    records: int
+    present_days: int
+    absent_days: int
+    leave_days: int
+    attendance_rate: Optional[float] = None
+    average_check_in: Optional[time] = None
+    late_arrivals: int
+    total_hours: float
+
+class AbsenceStreak(BaseModel):
+    employee_id: int
+    employee_code: str
+    first_name: str
+    last_name: str
+    department: Optional[str] = None
+    start_date: date
+    end_date: date
+    days: int
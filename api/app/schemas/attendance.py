@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from app.models.attendance import AttendanceStatus
 
@@ -24,4 +24,23 @@ class AttendanceResponse(AttendanceBase):
     employee_id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AttendanceGridEmployee(BaseModel):
+    id: int
+    employee_id: str
+    first_name: str
+    last_name: str
+    department: Optional[str] = None
+    # Parallel columns, one entry per recorded day; `day` counts from the grid's start_date
+    day: List[int]
+    status: List[str]
+    check_in: List[Optional[str]]
+    check_out: List[Optional[str]]
+
+class AttendanceGrid(BaseModel):
+    start_date: date
+    end_date: date
+    employees: List[AttendanceGridEmployee]
+    # Pass as `after` for the next page of employees
+    next_after: Optional[int] = None
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+class AuditLogEntry(BaseModel):
+    id: int
+    entity_type: str
+    entity_id: int
+    changed_by: Optional[int] = None
+    changes: Dict[str, List[Any]]
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AuditLogPage(BaseModel):
+    entries: List[AuditLogEntry]
+    # Pass as `before` to fetch the next (older) page; None on the last page
+    next_before: Optional[int] = None
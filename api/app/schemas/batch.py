@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Any, List, Literal, Optional
+
+class BatchItem(BaseModel):
+    # Echoed back so the client can match responses to requests
+    id: Optional[str] = None
+    method: Literal["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    # Path and query string of an API route, e.g. "/api/attendance/employee/5?start_date=2024-01-01"
+    path: str
+    body: Optional[Any] = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+class BatchItemResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Optional[Any] = None
+
+class BatchResponse(BaseModel):
+    responses: List[BatchItemResponse]
@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+from app.models.attendance import AttendanceStatus
+
+class CalendarOperationCreate(BaseModel):
+    status: AttendanceStatus = AttendanceStatus.HOLIDAY
+    start_date: date
+    end_date: date
+    # Leave empty to apply to every employee
+    department: Optional[str] = None
+    include_weekends: bool = True
+
+class CalendarOperationPreview(BaseModel):
+    days: int
+    employees: int
+    records_to_create: int
+    existing_records: int
+
+class CalendarOperationResponse(BaseModel):
+    id: int
+    status: AttendanceStatus
+    start_date: date
+    end_date: date
+    department: Optional[str] = None
+    include_weekends: bool
+    records_created: int
+    created_by: Optional[int] = None
+    created_at: Optional[datetime] = None
+    undone_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class CalendarUndoResponse(BaseModel):
+    id: int
+    records_removed: int
+
+class AttendanceCloseOutResponse(BaseModel):
+    start_date: date
+    end_date: date
+    absent_created: int
+    checked_out: int
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from decimal import Decimal
+
+class DashboardSummary(BaseModel):
+    date: date
+    total_employees: int
+    present_today: int
+    absent_today: int
+    on_leave_today: int
+    # Employees with no attendance record yet today
+    not_recorded_today: int
+    pending_invitations: int
+    unpaid_salary_records: int
+    unpaid_salary_total: Decimal
+    computed_at: datetime
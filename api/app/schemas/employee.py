@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from decimal import Decimal
 from app.schemas.user import UserResponse
@@ -37,4 +37,45 @@ class EmployeeResponse(EmployeeBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class EmployeeSearchResult(BaseModel):
+    id: int
+    employee_id: str
+    first_name: str
+    last_name: str
+    email: Optional[str] = None
+    department: Optional[str] = None
+    position: Optional[str] = None
+    score: float
+
+class EmployeeBulkFilter(BaseModel):
+    employee_ids: Optional[List[int]] = None
+    department: Optional[str] = None
+
+class EmployeeBulkChange(BaseModel):
+    department: Optional[str] = None
+    position: Optional[str] = None
+    # Base salary changes: scale by a percentage (10 = +10%) or add a fixed amount (may be negative)
+    salary_percent: Optional[Decimal] = None
+    salary_amount: Optional[Decimal] = None
+
+class EmployeeBulkUpdate(BaseModel):
+    filter: EmployeeBulkFilter
+    change: EmployeeBulkChange
+
+class EmployeeBulkUpdatePreview(BaseModel):
+    matched: int
+    current_salary_total: Optional[Decimal] = None
+    new_salary_total: Optional[Decimal] = None
+
+class EmployeeBulkUpdated(BaseModel):
+    id: int
+    employee_id: str
+    department: Optional[str] = None
+    position: Optional[str] = None
+    base_salary: Optional[Decimal] = None
+
+class EmployeeBulkUpdateResponse(BaseModel):
+    updated: int
+    employees: List[EmployeeBulkUpdated]
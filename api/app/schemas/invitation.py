@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from decimal import Decimal
 from app.models.invitation import InvitationStatus
@@ -41,4 +41,14 @@ class InvitationAccept(BaseModel):
 class InvitationAcceptResponse(BaseModel):
     message: str
     user_id: int
-    employee_id: int
\ No newline at end of file
+    employee_id: int
+
+class InvitationBulkError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    employee_id: Optional[str] = None
+    detail: str
+
+class InvitationBulkResponse(BaseModel):
+    created: List[InvitationResponse]
+    errors: List[InvitationBulkError]
\ No newline at end of file
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import Optional
+from decimal import Decimal
+
+class PayrollTotals(BaseModel):
+    employees: int
+    base_amount: Decimal
+    overtime_amount: Decimal
+    bonus: Decimal
+    deductions: Decimal
+    gross_amount: Decimal
+    net_amount: Decimal
+
+class PayrollMonth(PayrollTotals):
+    # Set when grouped by department or by employee respectively
+    department: Optional[str] = None
+    employee_id: Optional[int] = None
+    year: int
+    month: int
+    ytd_gross_amount: Decimal
+    ytd_net_amount: Decimal
+    ytd_bonus: Decimal
+    ytd_deductions: Decimal
+    # Change in net amount from the group's previous month with salary records
+    net_change: Optional[Decimal] = None
+
+class PayrollYear(PayrollTotals):
+    department: Optional[str] = None
+    employee_id: Optional[int] = None
+    year: int
+    net_change: Optional[Decimal] = None
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import date
+from decimal import Decimal
+
+class WorkHoursSummary(BaseModel):
+    employee_id: int
+    period_start: date
+    days_worked: int
+    hours: float
+    regular_hours: float
+    overtime_hours: float
+    overtime_pay: Decimal
+
+class OvertimeApplyResponse(BaseModel):
+    month: int
+    year: int
+    updated: int
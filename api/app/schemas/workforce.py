@@ -0,0 +1,31 @@
+from pydantic import BaseModel, EmailStr
+from typing import List, Optional
+from app.models.user import UserRole
+from app.schemas.employee import EmployeeBase
+
+class WorkforceImportRow(EmployeeBase):
+    username: str
+    email: EmailStr
+    # A random password is generated (and reported back) when the column is empty
+    password: Optional[str] = None
+    role: UserRole = UserRole.EMPLOYEE
+
+class WorkforceImportError(BaseModel):
+    row: int
+    username: Optional[str] = None
+    employee_id: Optional[str] = None
+    detail: str
+
+class WorkforceCredential(BaseModel):
+    row: int
+    username: str
+    password: str
+
+class WorkforceImportResponse(BaseModel):
+    created: int
+    # Last CSV row that was processed and committed; pass it as start_after_row to resume
+    last_row: int
+    errors: List[WorkforceImportError]
+    credentials: List[WorkforceCredential]
+    # Set when the import failed part-way: everything up to last_row is committed
+    stopped: Optional[str] = None
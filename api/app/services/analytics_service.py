@@ -0,0 +1,153 @@
+from datetime import date, time
+from typing import Callable, List, Optional
+from sqlalchemy import case, distinct, func
+from sqlalchemy.orm import Session
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.lookups import lookup_cache
+from app.core.sql_functions import day_number, hours_between, period_start, seconds_of_day
+from app.models.attendance import Attendance, AttendanceStatus, LEAVE_STATUSES
+from app.models.employee import Employee
+from app.schemas.analytics import AbsenceStreak, DepartmentAttendanceStats
+
+# Results for periods that ended before today only change when someone edits
+# old attendance, so they are cached until invalidate_attendance_analytics(),
+# which reaches every worker through the lookup cache's invalidation messages.
+# The TTL bounds staleness where those stay inside one worker (CACHE_BACKEND=memory).
+_closed_period_cache = LRUCache(maxsize=256, ttl=settings.closed_period_cache_seconds)
+ANALYTICS_CACHE_KEY = "analytics:attendance"
+lookup_cache.on_invalidate(ANALYTICS_CACHE_KEY, _closed_period_cache.clear)
+
+def invalidate_attendance_analytics():
+    lookup_cache.invalidate(ANALYTICS_CACHE_KEY)
+
+def _cached(key: tuple, end_date: date, compute: Callable[[], list]) -> list:
+    if end_date >= date.today():
+        return compute()
+    result = _closed_period_cache.get(key)
+    if result is None:
+        result = compute()
+        _closed_period_cache.set(key, result)
+    return result
+
+def _seconds_to_time(seconds: Optional[float]) -> Optional[time]:
+    if seconds is None:
+        return None
+    seconds = int(round(seconds)) % 86400
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+def attendance_summary(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    period: str = "month",
+    department: Optional[str] = None,
+    late_after: time = time(9, 0),
+) -> List[DepartmentAttendanceStats]:
+    key = ("summary", start_date, end_date, period, department, late_after)
+    return _cached(key, end_date, lambda: _attendance_summary(db, start_date, end_date, period, department, late_after))
+
+def _attendance_summary(db, start_date, end_date, period, department, late_after):
+    bucket = period_start(Attendance.date, period)
+    check_in_seconds = seconds_of_day(Attendance.check_in_time)
+    cutoff_seconds = late_after.hour * 3600 + late_after.minute * 60 + late_after.second
+
+    query = db.query(
+        Employee.department,
+        bucket.label("period_start"),
+        func.count(distinct(Attendance.employee_id)).label("employees"),
+        func.count(Attendance.id).label("records"),
+        func.sum(case((Attendance.status == AttendanceStatus.PRESENT, 1), else_=0)).label("present_days"),
+        func.sum(case((Attendance.status == AttendanceStatus.ABSENT, 1), else_=0)).label("absent_days"),
+        func.sum(case((Attendance.status.in_(LEAVE_STATUSES), 1), else_=0)).label("leave_days"),
+        func.avg(check_in_seconds).label("average_check_in"),
+        func.sum(case((check_in_seconds > cutoff_seconds, 1), else_=0)).label("late_arrivals"),
+        func.sum(hours_between(Attendance.check_in_time, Attendance.check_out_time)).label("total_hours"),
+    ).join(Employee, Employee.id == Attendance.employee_id).filter(
+        Attendance.date >= start_date,
+        Attendance.date <= end_date,
+    )
+    if department:
+        query = query.filter(Employee.department == department)
+
+    rows = query.group_by(Employee.department, bucket).order_by(bucket, Employee.department).all()
+
+    results = []
+    for row in rows:
+        worked_days = row.present_days + row.absent_days
+        results.append(DepartmentAttendanceStats(
+            department=row.department,
+            period_start=row.period_start,
+            employees=row.employees,
+            records=row.records,
+            present_days=row.present_days,
+            absent_days=row.absent_days,
+            leave_days=row.leave_days,
+            attendance_rate=round(row.present_days / worked_days, 4) if worked_days else None,
+            average_check_in=_seconds_to_time(row.average_check_in),
+            late_arrivals=row.late_arrivals,
+            total_hours=round(float(row.total_hours or 0), 2),
+        ))
+    return results
+
+def absence_streaks(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    department: Optional[str] = None,
+    min_days: int = 2,
+) -> List[AbsenceStreak]:
+    key = ("absence_streaks", start_date, end_date, department, min_days)
+    return _cached(key, end_date, lambda: _absence_streaks(db, start_date, end_date, department, min_days))
+
+def _absence_streaks(db, start_date, end_date, department, min_days):
+    # Gaps-and-islands: consecutive absent days share the same (day number - row number)
+    absences = db.query(
+        Attendance.employee_id.label("employee_id"),
+        Attendance.date.label("date"),
+        (
+            day_number(Attendance.date)
+            - func.row_number().over(partition_by=Attendance.employee_id, order_by=Attendance.date)
+        ).label("island"),
+    ).join(Employee, Employee.id == Attendance.employee_id).filter(
+        Attendance.status == AttendanceStatus.ABSENT,
+        Attendance.date >= start_date,
+        Attendance.date <= end_date,
+    )
+    if department:
+        absences = absences.filter(Employee.department == department)
+    absences = absences.subquery()
+
+    streaks = db.query(
+        absences.c.employee_id,
+        func.min(absences.c.date).label("start_date"),
+        func.max(absences.c.date).label("end_date"),
+        func.count().label("days"),
+    ).group_by(absences.c.employee_id, absences.c.island).having(func.count() >= min_days).subquery()
+
+    rows = db.query(
+        Employee.id,
+        Employee.employee_id,
+        Employee.first_name,
+        Employee.last_name,
+        Employee.department,
+        streaks.c.start_date,
+        streaks.c.end_date,
+        streaks.c.days,
+    ).join(streaks, streaks.c.employee_id == Employee.id).order_by(
+        streaks.c.days.desc(), streaks.c.start_date
+    ).all()
+
+    return [
+        AbsenceStreak(
+            employee_id=row[0],
+            employee_code=row[1],
+            first_name=row.first_name,
+            last_name=row.last_name,
+            department=row.department,
+            start_date=row.start_date,
+            end_date=row.end_date,
+            days=row.days,
+        )
+        for row in rows
+    ]
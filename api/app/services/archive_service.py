@@ -0,0 +1,182 @@
+"""Cold archive of closed years of attendance and salary records.
+
+Each archived year of a table is one zstd-compressed Parquet file,
+{archive_dir}/{table}/{year}.parquet, sorted by employee_id so the row-group
+statistics let a per-employee read skip almost all of the file. Reads are
+memory-mapped and only decode the requested columns.
+
+pyarrow is an optional dependency (`uv sync --extra archive`); it is only
+imported once an archive is written or an archived year is read.
+"""
+
+import os
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Union
+from sqlalchemy import Boolean, Date, DateTime, Enum, Integer, Numeric, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.attendance import Attendance
+from app.models.salary import SalaryRecord
+
+ARCHIVED_MODELS = {model.__tablename__: model for model in (Attendance, SalaryRecord)}
+ROW_GROUP_SIZE = 50_000
+FETCH_SIZE = 10_000
+DELETE_CHUNK = 5_000
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError("The cold archive needs pyarrow: install the 'archive' extra") from exc
+    return pyarrow
+
+def _table_dir(table: str) -> str:
+    return os.path.join(settings.archive_dir, table)
+
+def _year_path(table: str, year: int) -> str:
+    return os.path.join(_table_dir(table), f"{year}.parquet")
+
+def archived_years(table: str) -> List[int]:
+    try:
+        names = os.listdir(_table_dir(table))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-8]) for name in names if name.endswith(".parquet") and name[:-8].isdigit())
+
+def _arrow_schema(model):
+    pa = _pyarrow()
+    fields = []
+    for column in model.__table__.columns:
+        column_type = column.type
+        if isinstance(column_type, Enum):
+            arrow_type = pa.string()
+        elif isinstance(column_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, Numeric):
+            arrow_type = pa.decimal128(column_type.precision, column_type.scale)
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+        elif isinstance(column_type, Date):
+            arrow_type = pa.date32()
+        elif isinstance(column_type, Boolean):
+            arrow_type = pa.bool_()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable or column.primary_key))
+    return pa.schema(fields)
+
+def _year_filter(model, year: int):
+    if model is Attendance:
+        return (Attendance.date >= date(year, 1, 1)) & (Attendance.date < date(year + 1, 1, 1))
+    return SalaryRecord.year == year
+
+def archive_year(db: Session, table: str, year: int) -> int:
+    """Move one closed year of `table` into its archive file; returns the number of rows moved.
+
+    The file is written and renamed into place before any row is deleted, and only the
+    exported ids are deleted, so an interrupted run never loses data. Running it again
+    for an already archived year merges any newer rows into the existing file; rows that
+    are already in the file (left in the table by a run that stopped before deleting them)
+    replace their archived copy instead of being archived twice.
+    """
+    pa = _pyarrow()
+    model = ARCHIVED_MODELS[table]
+    schema = _arrow_schema(model)
+    columns = list(model.__table__.columns)
+
+    batches = []
+    ids = []
+    result = db.execute(
+        select(*columns).where(_year_filter(model, year)).order_by(model.employee_id, model.id)
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+    for rows in result.partitions():
+        data = {column.name: [] for column in columns}
+        for row in rows:
+            for column, value in zip(columns, row):
+                data[column.name].append(value.value if isinstance(column.type, Enum) and value is not None else value)
+        ids.extend(data["id"])
+        batches.append(pa.RecordBatch.from_pydict(data, schema=schema))
+    if not ids:
+        return 0
+
+    path = _year_path(table, year)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    exported = pa.Table.from_batches(batches, schema=schema)
+    if os.path.exists(path):
+        existing = pa.parquet.read_table(path, schema=schema)
+        existing = existing.filter(pa.compute.invert(pa.compute.is_in(existing["id"], value_set=exported["id"])))
+        exported = pa.concat_tables([existing, exported]).sort_by(
+            [("employee_id", "ascending"), ("id", "ascending")]
+        )
+    temporary = f"{path}.tmp"
+    pa.parquet.write_table(
+        exported, temporary, compression="zstd", row_group_size=ROW_GROUP_SIZE, write_statistics=True
+    )
+    with open(temporary, "rb") as written:
+        os.fsync(written.fileno())
+    os.replace(temporary, path)
+
+    for start in range(0, len(ids), DELETE_CHUNK):
+        db.query(model).filter(model.id.in_(ids[start:start + DELETE_CHUNK])).delete(synchronize_session=False)
+    db.commit()
+    return len(ids)
+
+def read_archived(
+    table: str,
+    employee_id: Union[int, Sequence[int]],
+    years: Sequence[int],
+    columns: Optional[List[str]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> List[Dict]:
+    """Rows of one employee (or a list of them) from the archived `years` of `table`, oldest first"""
+    wanted = set(years)
+    archived = [year for year in archived_years(table) if year in wanted]
+    if not archived:
+        return []
+    pa = _pyarrow()
+    if isinstance(employee_id, int):
+        filters = [("employee_id", "=", employee_id)]
+    else:
+        filters = [("employee_id", "in", list(employee_id))]
+    if start_date is not None:
+        filters.append(("date", ">=", start_date))
+    if end_date is not None:
+        filters.append(("date", "<=", end_date))
+    rows = []
+    for year in archived:
+        # Row groups whose employee_id/date statistics can't match are skipped without being read
+        scanned = pa.parquet.read_table(
+            _year_path(table, year), columns=columns, filters=filters, memory_map=True
+        )
+        rows.extend(scanned.to_pylist())
+    return rows
+
+def archived_attendance(
+    employee_id: Union[int, Sequence[int]], start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> List[Dict]:
+    """Archived attendance of one or more employees within the date range, newest first like the hot query"""
+    years = archived_years(Attendance.__tablename__)
+    if start_date is not None:
+        years = [year for year in years if year >= start_date.year]
+    if end_date is not None:
+        years = [year for year in years if year <= end_date.year]
+    if not years:
+        return []
+    columns = ["id", "employee_id", "date", "check_in_time", "check_out_time", "status", "notes"]
+    rows = read_archived(Attendance.__tablename__, employee_id, years, columns, start_date, end_date)
+    return sorted(rows, key=lambda row: row["date"], reverse=True)
+
+def archived_salary_records(employee_id: int) -> List[Dict]:
+    years = archived_years(SalaryRecord.__tablename__)
+    if not years:
+        return []
+    columns = [
+        "id", "employee_id", "month", "year", "base_amount", "overtime_amount",
+        "deductions", "bonus", "net_amount", "status", "payment_date",
+    ]
+    rows = read_archived(SalaryRecord.__tablename__, employee_id, years, columns)
+    return sorted(rows, key=lambda row: (row["year"], row["month"]))
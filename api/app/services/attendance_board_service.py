@@ -0,0 +1,85 @@
+"""Live "who is in today" board: snapshot rows and check-in/check-out events share one shape.
+
+A client applies the snapshot, then upserts each event's row by employee_id.
+"""
+
+import asyncio
+import json
+from datetime import date
+from typing import AsyncIterator, Optional
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.events import Subscription, attendance_events
+from app.models.attendance import Attendance
+from app.models.employee import Employee
+
+def board_row(attendance: Attendance, employee: Employee) -> dict:
+    return {
+        "employee_id": employee.id,
+        "employee_code": employee.employee_id,
+        "first_name": employee.first_name,
+        "last_name": employee.last_name,
+        "department": employee.department,
+        "status": attendance.status.value,
+        "check_in_time": attendance.check_in_time,
+        "check_out_time": attendance.check_out_time,
+    }
+
+def board_snapshot(db: Session, department: Optional[str] = None) -> dict:
+    today = date.today()
+    query = db.query(Attendance, Employee).join(Employee, Employee.id == Attendance.employee_id).filter(
+        Attendance.date == today
+    )
+    if department:
+        query = query.filter(Employee.department == department)
+    rows = [board_row(attendance, employee) for attendance, employee in query.order_by(Employee.id)]
+    return {"date": today, "employees": rows}
+
+def publish_attendance_event(event_type: str, attendance: Attendance, employee: Employee):
+    attendance_events.publish({"type": event_type, "date": attendance.date, **board_row(attendance, employee)})
+
+def subscribe_to_board(department: Optional[str] = None) -> Subscription:
+    if department:
+        return attendance_events.subscribe(lambda event: event["department"] == department)
+    return attendance_events.subscribe()
+
+def _sse(event_type: str, data) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+def _fresh_snapshot(department: Optional[str]) -> dict:
+    db = SessionLocal()
+    try:
+        return board_snapshot(db, department)
+    finally:
+        db.close()
+
+async def board_stream(
+    request: Request, subscription: Subscription, snapshot: dict, department: Optional[str] = None
+) -> AsyncIterator[str]:
+    """Server-sent events: the snapshot, then one event per check-in/check-out.
+
+    A subscriber that fell too far behind gets a new snapshot instead of the events it missed.
+    """
+    try:
+        yield _sse("snapshot", snapshot)
+        while True:
+            if subscription.overflowed:
+                # Reset before querying so events published during the query are still delivered
+                subscription.reset()
+                yield _sse("snapshot", await run_in_threadpool(_fresh_snapshot, department))
+                continue
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.event_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comment line: keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse(event["type"], event)
+    finally:
+        attendance_events.unsubscribe(subscription)
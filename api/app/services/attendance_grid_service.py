@@ -0,0 +1,91 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Optional, Sequence
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from app.models.attendance import Attendance
+from app.models.employee import Employee
+from app.services.archive_service import archived_attendance
+
+MAX_GRID_DAYS = 93
+MAX_GRID_EMPLOYEES = 500
+
+def _clock(moment: Optional[datetime]) -> Optional[str]:
+    return moment.strftime("%H:%M") if moment is not None else None
+
+def attendance_grid(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    employee_ids: Optional[Sequence[int]] = None,
+    department: Optional[str] = None,
+    limit: int = MAX_GRID_EMPLOYEES,
+    after: Optional[int] = None,
+) -> dict:
+    """Attendance of many employees over a date range, as one column list per field and employee.
+
+    Employees and their records come from one query: a page of `limit` employees in id order
+    (after the id `after`) LEFT JOIN attendance on (employee_id, date range), which the
+    (employee_id, date) unique index answers and which Postgres prunes to the range's
+    partitions. Employees without records get empty columns. Days are given as offsets from
+    start_date and times as HH:MM.
+    """
+    page = db.query(
+        Employee.id, Employee.employee_id, Employee.first_name, Employee.last_name, Employee.department
+    )
+    if employee_ids:
+        page = page.filter(Employee.id.in_(employee_ids))
+    if department is not None:
+        page = page.filter(Employee.department == department)
+    if after is not None:
+        page = page.filter(Employee.id > after)
+    # One extra employee tells whether there is a next page
+    page = page.order_by(Employee.id).limit(limit + 1).subquery()
+
+    in_range = and_(
+        Attendance.employee_id == page.c.id,
+        Attendance.date >= start_date,
+        Attendance.date <= end_date,
+    )
+    rows = db.query(
+        page,
+        Attendance.date,
+        Attendance.status,
+        Attendance.check_in_time,
+        Attendance.check_out_time,
+    ).outerjoin(Attendance, in_range).order_by(page.c.id, Attendance.date).all()
+
+    employees: Dict[int, dict] = {}
+    cells = defaultdict(list)
+    next_after = None
+    for row in rows:
+        if row.id not in employees:
+            if len(employees) == limit:
+                next_after = max(employees)
+                break
+            employees[row.id] = {
+                "id": row.id,
+                "employee_id": row.employee_id,
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "department": row.department,
+            }
+        if row.date is not None:
+            cells[row.id].append((row.date, row.status.value, row.check_in_time, row.check_out_time))
+
+    if employees:
+        # Archived years are all older than the table's rows, so they sort in front of them
+        for archived in archived_attendance(list(employees), start_date, end_date):
+            cells[archived["employee_id"]].append((
+                archived["date"], archived["status"], archived["check_in_time"], archived["check_out_time"],
+            ))
+
+    grid = []
+    for employee_id, employee in employees.items():
+        days = sorted(cells[employee_id], key=lambda cell: cell[0])
+        employee["day"] = [(cell[0] - start_date).days for cell in days]
+        employee["status"] = [cell[1] for cell in days]
+        employee["check_in"] = [_clock(cell[2]) for cell in days]
+        employee["check_out"] = [_clock(cell[3]) for cell in days]
+        grid.append(employee)
+    return {"start_date": start_date, "end_date": end_date, "employees": grid, "next_after": next_after}
@@ -0,0 +1,135 @@
+"""Append-only change log for employees, salary records and attendance.
+
+Entries are buffered in memory and written by a background task in bulk
+inserts, so recording a change costs the request a list append. The buffer
+is flushed on graceful shutdown; without a running flusher (scripts, the
+test client without lifespan) entries are written through immediately.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List, Optional
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDITED_ENTITIES = ("employee", "salary_record", "attendance")
+
+def diff_changes(obj, update_data: dict) -> dict:
+    """Return {field: [old, new]} for the fields in update_data that differ from obj"""
+    changes = {}
+    for field, value in update_data.items():
+        old = getattr(obj, field)
+        if old != value:
+            # Money stays exact in the log instead of becoming a float
+            changes[field] = jsonable_encoder([old, value], custom_encoder={Decimal: str})
+    return changes
+
+class AuditBuffer:
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._loop = None
+        self._wake = None
+        self._task = None
+
+    def record(self, entity_type: str, entity_id: int, changes: dict, changed_by: Optional[int] = None):
+        if not changes:
+            return
+        entry = {
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "changed_by": changed_by,
+            "changes": changes,
+            "changed_at": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            self._pending.append(entry)
+            pending = len(self._pending)
+        if self._task is None:
+            self.flush()
+        elif pending >= self.batch_size:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def backlog(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """Write all buffered entries in one bulk insert; on failure they stay buffered"""
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+            if not entries:
+                return 0
+            db = SessionLocal()
+            try:
+                db.execute(insert(AuditLog), entries)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self._pending[:0] = entries
+                raise
+            finally:
+                db.close()
+            return len(entries)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await run_in_threadpool(self.flush)
+            except Exception:
+                logger.exception("Failed to flush audit log, will retry")
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await run_in_threadpool(self.flush)
+
+audit_log = AuditBuffer(settings.audit_batch_size, settings.audit_flush_interval_seconds)
+
+def audit_history(
+    db: Session,
+    entity_type: str,
+    entity_id: int,
+    limit: int = 50,
+    before: Optional[int] = None,
+) -> List[AuditLog]:
+    """Newest-first page of changes to one record; pass the last id seen as `before` for the next page"""
+    # Make this worker's own recent changes visible before reading. A failed flush leaves them
+    # buffered for the flusher to retry and must not fail the read.
+    try:
+        audit_log.flush()
+    except Exception:
+        logger.exception("Failed to flush audit log before reading history")
+    query = db.query(AuditLog).filter(AuditLog.entity_type == entity_type, AuditLog.entity_id == entity_id)
+    if before is not None:
+        query = query.filter(AuditLog.id < before)
+    return query.order_by(AuditLog.id.desc()).limit(limit).all()
@@ -0,0 +1,150 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import Date, and_, case, exists, func, literal, select, true, union_all, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.sql_functions import plus_seconds
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.calendar import CalendarOperation
+from app.models.employee import Employee
+from app.models.user import User
+from app.services.audit_service import audit_log
+
+MAX_CALENDAR_DAYS = 366
+
+def calendar_days(start_date: date, end_date: date, include_weekends: bool = True) -> List[date]:
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    if not include_weekends:
+        days = [day for day in days if day.weekday() < 5]
+    return days
+
+def _targets(days: List[date], department: Optional[str], active_only: bool = False):
+    """(employee_id, date) for every employee on the payroll on each day, as one SELECT"""
+    # A UNION ALL of literals rather than VALUES, which SQLite cannot alias as a table
+    day_table = union_all(*[select(literal(day, Date).label("day")) for day in days]).subquery("calendar_days")
+    query = (
+        select(Employee.id.label("employee_id"), day_table.c.day.label("date"))
+        .select_from(Employee)
+        .join(day_table, true())
+        .where(Employee.hire_date <= day_table.c.day)
+    )
+    if department:
+        query = query.where(Employee.department == department)
+    if active_only:
+        query = query.join(User, User.id == Employee.user_id).where(User.is_active.is_(True))
+    return query
+
+def _insert(db: Session):
+    # Dialect modules are imported on first use, not when the app is imported
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+def preview_calendar_operation(
+    db: Session, days: List[date], department: Optional[str] = None
+) -> dict:
+    """Counts for a dry run: how many records would be created and how many already exist"""
+    targets = _targets(days, department).subquery()
+    existing = exists().where(
+        Attendance.employee_id == targets.c.employee_id, Attendance.date == targets.c.date
+    )
+    total, already_recorded, employees = db.query(
+        func.count(),
+        func.count().filter(existing),
+        func.count(func.distinct(targets.c.employee_id)),
+    ).select_from(targets).one()
+    return {
+        "days": len(days),
+        "employees": employees,
+        "records_to_create": total - already_recorded,
+        "existing_records": already_recorded,
+    }
+
+def apply_calendar_operation(db: Session, operation: CalendarOperation) -> int:
+    """Insert one attendance row per employee and day in a single INSERT ... SELECT.
+
+    Days that already have a record for an employee are left untouched (ON CONFLICT DO NOTHING).
+    """
+    days = calendar_days(operation.start_date, operation.end_date, operation.include_weekends)
+    db.add(operation)
+    db.flush()
+
+    targets = _targets(days, operation.department).add_columns(
+        literal(operation.status, Attendance.status.type).label("status"),
+        literal(operation.id).label("calendar_operation_id"),
+    )
+    statement = _insert(db)(Attendance).from_select(
+        ["employee_id", "date", "status", "calendar_operation_id"], targets
+    ).on_conflict_do_nothing(index_elements=["employee_id", "date"])
+    operation.records_created = db.execute(statement).rowcount
+    db.commit()
+    db.refresh(operation)
+    return operation.records_created
+
+def undo_calendar_operation(db: Session, operation: CalendarOperation) -> int:
+    """Delete the records the operation created, except ones whose status was changed since"""
+    # The date bounds let Postgres prune to the operation's partitions
+    created = and_(
+        Attendance.calendar_operation_id == operation.id,
+        Attendance.date >= operation.start_date,
+        Attendance.date <= operation.end_date,
+    )
+    removed = db.query(Attendance).filter(created, Attendance.status == operation.status).delete(
+        synchronize_session=False
+    )
+    # Records that were edited stay, but no longer belong to the operation
+    db.query(Attendance).filter(created).update({"calendar_operation_id": None}, synchronize_session=False)
+    operation.undone_at = datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(operation)
+    return removed
+
+AUTO_CHECKOUT_NOTE = "Checked out automatically"
+
+def _auto_checkout_time():
+    if settings.attendance_auto_checkout_hours is not None:
+        closing = plus_seconds(Attendance.check_in_time, settings.attendance_auto_checkout_hours * 3600)
+    else:
+        at = settings.attendance_auto_checkout_time
+        closing = plus_seconds(Attendance.date, at.hour * 3600 + at.minute * 60 + at.second)
+    # A check-in after the closing time is closed at the check-in itself rather than before it
+    return case((closing < Attendance.check_in_time, Attendance.check_in_time), else_=closing)
+
+def close_out_attendance(db: Session, start_date: date, end_date: date, changed_by: Optional[int] = None) -> dict:
+    """Complete the attendance of every day in the range, so reports need no anti-joins for gaps.
+
+    Active employees without a record for a day get an ABSENT row (INSERT ... SELECT, one
+    statement per MAX_CALENDAR_DAYS days), and check-ins without a check-out are closed by the
+    auto-checkout rule in one UPDATE. Running it again for the same days changes nothing.
+    Whether an employee is active is judged by their account today, also for past days.
+    """
+    days = calendar_days(start_date, end_date, settings.attendance_closeout_weekends)
+    absent_created = 0
+    for offset in range(0, len(days), MAX_CALENDAR_DAYS):
+        targets = _targets(days[offset:offset + MAX_CALENDAR_DAYS], None, active_only=True).add_columns(
+            literal(AttendanceStatus.ABSENT, Attendance.status.type).label("status"),
+        )
+        statement = _insert(db)(Attendance).from_select(
+            ["employee_id", "date", "status"], targets
+        ).on_conflict_do_nothing(index_elements=["employee_id", "date"])
+        absent_created += db.execute(statement).rowcount
+        db.commit()
+
+    closed = db.execute(
+        update(Attendance).where(
+            Attendance.date >= start_date,
+            Attendance.date <= end_date,
+            Attendance.check_in_time.isnot(None),
+            Attendance.check_out_time.is_(None),
+        ).values(
+            check_out_time=_auto_checkout_time(),
+            notes=func.coalesce(Attendance.notes + "\n", "") + AUTO_CHECKOUT_NOTE,
+        ).returning(Attendance.id, Attendance.check_out_time),
+        execution_options={"synchronize_session": False},
+    ).all()
+    db.commit()
+    for row in closed:
+        audit_log.record("attendance", row.id, {"check_out_time": [None, row.check_out_time.isoformat()]}, changed_by)
+    return {"start_date": start_date, "end_date": end_date, "absent_created": absent_created, "checked_out": len(closed)}
@@ -0,0 +1,89 @@
+"""Counters for the admin landing page, from one statement cached for a few seconds.
+
+Each table is scanned once in its own conditional-aggregate subquery and the
+one-row results are cross joined, so every counter comes back in a single
+round trip. A worker reuses the result for DASHBOARD_CACHE_SECONDS, and
+requests arriving while it is being computed wait for that computation instead
+of starting their own.
+"""
+
+import asyncio
+from datetime import date, datetime, timezone
+from typing import Callable, Dict
+from sqlalchemy import func, true
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.attendance import Attendance, AttendanceStatus, LEAVE_STATUSES
+from app.models.employee import Employee
+from app.models.invitation import Invitation, InvitationStatus
+from app.models.salary import SalaryRecord, SalaryStatus
+
+_summary_cache = LRUCache(maxsize=4)
+_in_flight: Dict[date, asyncio.Future] = {}
+
+def compute_dashboard_summary(db: Session, today: date) -> dict:
+    employees = db.query(func.count(Employee.id).label("total")).subquery()
+    attendance = db.query(
+        func.count(Attendance.id).label("recorded"),
+        func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present"),
+        func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.ABSENT).label("absent"),
+        func.count(Attendance.id).filter(Attendance.status.in_(LEAVE_STATUSES)).label("on_leave"),
+    ).filter(Attendance.date == today).subquery()
+    invitations = db.query(func.count(Invitation.id).label("pending")).filter(
+        Invitation.status == InvitationStatus.PENDING,
+        Invitation.expires_at > datetime.now(timezone.utc),
+    ).subquery()
+    unpaid = SalaryRecord.status != SalaryStatus.PAID
+    salaries = db.query(
+        func.count(SalaryRecord.id).filter(unpaid).label("unpaid"),
+        func.coalesce(func.sum(SalaryRecord.net_amount).filter(unpaid), 0).label("unpaid_total"),
+    ).filter(SalaryRecord.year == today.year, SalaryRecord.month == today.month).subquery()
+
+    row = db.query(employees, attendance, invitations, salaries).select_from(employees).join(
+        attendance, true()
+    ).join(invitations, true()).join(salaries, true()).one()
+    return {
+        "date": today,
+        "total_employees": row.total,
+        "present_today": row.present,
+        "absent_today": row.absent,
+        "on_leave_today": row.on_leave,
+        "not_recorded_today": max(row.total - row.recorded, 0),
+        "pending_invitations": row.pending,
+        "unpaid_salary_records": row.unpaid,
+        "unpaid_salary_total": row.unpaid_total,
+        "computed_at": datetime.now(timezone.utc),
+    }
+
+def _compute(today: date, session_factory: Callable[[], Session]) -> dict:
+    db = session_factory()
+    try:
+        return compute_dashboard_summary(db, today)
+    finally:
+        db.close()
+
+async def dashboard_summary(session_factory: Callable[[], Session] = SessionLocal) -> dict:
+    """The cached summary, computing it at most once per worker at a time.
+
+    The computation uses its own session, as it outlives any one of the requests waiting for it.
+    """
+    today = date.today()
+    summary = _summary_cache.get(today)
+    if summary is not None:
+        return summary
+    pending = _in_flight.get(today)
+    if pending is None:
+        pending = asyncio.ensure_future(run_in_threadpool(_compute, today, session_factory))
+        _in_flight[today] = pending
+
+        def finished(future: asyncio.Future):
+            _in_flight.pop(today, None)
+            if not future.cancelled() and future.exception() is None:
+                _summary_cache.set(today, future.result(), settings.dashboard_cache_seconds)
+
+        pending.add_done_callback(finished)
+    # A client that disconnects only stops waiting; the others still get the result
+    return await asyncio.shield(pending)
@@ -1,23 +1,33 @@
-import aiosmtplib
 import io
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from jinja2 import Template
-from typing import List, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from app.core.config import settings
 from app.models.employee import Employee
 from app.models.salary import SalaryRecord
 import csv
 
-async def send_email(
+# aiosmtplib, jinja2 and the MIME classes are imported on first use so that
+# importing the API (or a CLI tool) doesn't pay for the email stack
+if TYPE_CHECKING:
+    from email.mime.multipart import MIMEMultipart
+
+@lru_cache(maxsize=None)
+def compile_template(source: str):
+    from jinja2 import Template
+    return Template(source)
+
+def build_message(
     to_email: str,
     subject: str,
     html_content: str,
     text_content: Optional[str] = None,
     attachments: Optional[List[dict]] = None
-):
+) -> "MIMEMultipart":
+    from email import encoders
+    from email.mime.base import MIMEBase
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     message = MIMEMultipart("alternative")
     message["Subject"] = subject
     message["From"] = f"{settings.smtp_from_name} <{settings.smtp_from_email}>"
@@ -41,6 +51,22 @@ async def send_email(
             )
             message.attach(part)
 
+    return message
+
+async def send_email(
+    to_email: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None,
+    attachments: Optional[List[dict]] = None
+):
+    if not settings.smtp_configured:
+        print(f"SMTP is not configured, skipping email to {to_email}")
+        return False
+
+    import aiosmtplib
+    message = build_message(to_email, subject, html_content, text_content, attachments)
+
     try:
         await aiosmtplib.send(
             message,
@@ -55,6 +81,35 @@ async def send_email(
         print(f"Failed to send email: {e}")
         return False
 
+async def send_bulk_email(messages: List["MIMEMultipart"]) -> int:
+    """Send several messages over a single SMTP connection, returning how many were delivered"""
+    if not messages:
+        return 0
+    if not settings.smtp_configured:
+        print(f"SMTP is not configured, skipping {len(messages)} emails")
+        return 0
+
+    import aiosmtplib
+    sent = 0
+    smtp = aiosmtplib.SMTP(
+        hostname=settings.smtp_host,
+        port=settings.smtp_port,
+        start_tls=True,
+        username=settings.smtp_username,
+        password=settings.smtp_password,
+    )
+    try:
+        async with smtp:
+            for message in messages:
+                try:
+                    await smtp.send_message(message)
+                    sent += 1
+                except Exception as e:
+                    print(f"Failed to send email to {message['To']}: {e}")
+    except Exception as e:
+        print(f"Failed to send bulk email: {e}")
+    return sent
+
 def generate_salary_report_csv(employee: Employee, salary_record: SalaryRecord) -> str:
     output = io.StringIO()
     writer = csv.writer(output)
@@ -86,7 +141,7 @@ async def send_salary_update_notification(
 ):
     subject = f"Salary Update - {salary_record.month}/{salary_record.year}"
     
-    html_template = Template("""
+    html_template = compile_template("""
     <html>
     <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
         <h2 style="color: #333;">Salary Update Notification</h2>
@@ -164,7 +219,7 @@ async def send_salary_update_notification(
 async def send_welcome_email(to_email: str, employee_name: str, username: str, temp_password: str):
     subject = "Welcome to Employee Management System"
     
-    html_template = Template("""
+    html_template = compile_template("""
     <html>
     <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
         <h2 style="color: #333;">Welcome to the Team!</h2>
@@ -209,13 +264,13 @@ async def send_welcome_email(to_email: str, employee_name: str, username: str, t
         html_content=html_content
     )
 
-async def send_employee_invitation(to_email: str, token: str):
+def build_employee_invitation(to_email: str, token: str) -> "MIMEMultipart":
     subject = "Employee Invitation - Join Our Team"
     
     # You'll need to replace this URL with your actual frontend URL
     invitation_link = f"http://localhost:3000/invitation/accept?token={token}"
     
-    html_template = Template("""
+    html_template = compile_template("""
     <html>
     <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
         <h2 style="color: #333;">You're Invited to Join Our Team!</h2>
@@ -265,8 +320,17 @@ async def send_employee_invitation(to_email: str, token: str):
         company_name=settings.smtp_from_name
     )
     
-    return await send_email(
+    return build_message(
         to_email=to_email,
         subject=subject,
         html_content=html_content
-    )
\ No newline at end of file
+    )
+
+async def send_employee_invitation(to_email: str, token: str):
+    message = build_employee_invitation(to_email, token)
+    return await send_bulk_email([message]) == 1
+
+async def send_employee_invitations(invitations: List[Tuple[str, str]]) -> int:
+    """Send invitation emails for (email, token) pairs in one SMTP session"""
+    messages = [build_employee_invitation(email, token) for email, token in invitations]
+    return await send_bulk_email(messages)
\ No newline at end of file
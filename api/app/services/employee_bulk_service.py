@@ -0,0 +1,112 @@
+from decimal import Decimal
+from typing import List, Optional
+from sqlalchemy import func, null, or_, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.lookups import invalidate_employees
+from app.models.employee import Employee
+from app.schemas.employee import EmployeeBulkChange, EmployeeBulkFilter
+from app.services.audit_service import audit_log, diff_changes
+from app.services.payroll_service import invalidate_payroll_aggregates
+from app.services.search_service import invalidate_employee_search
+
+RETURNED_COLUMNS = (Employee.id, Employee.user_id, Employee.employee_id, Employee.department, Employee.position, Employee.base_salary)
+# Largest value base_salary's Numeric(precision, scale) column can hold
+_SALARY_TYPE = Employee.base_salary.type
+MAX_SALARY = Decimal(10) ** (_SALARY_TYPE.precision - _SALARY_TYPE.scale) - Decimal(1).scaleb(-_SALARY_TYPE.scale)
+
+def _conditions(employee_filter: EmployeeBulkFilter) -> list:
+    conditions = []
+    if employee_filter.employee_ids:
+        conditions.append(Employee.id.in_(employee_filter.employee_ids))
+    if employee_filter.department is not None:
+        conditions.append(Employee.department == employee_filter.department)
+    return conditions
+
+def _new_values(change: EmployeeBulkChange) -> dict:
+    """SET clause of the update; salary changes are SQL expressions over the current value"""
+    values = {}
+    if change.department is not None:
+        values["department"] = change.department
+    if change.position is not None:
+        values["position"] = change.position
+    if change.salary_percent is not None:
+        values["base_salary"] = func.round(
+            Employee.base_salary * (1 + change.salary_percent / 100), 2, type_=Employee.base_salary.type
+        )
+    elif change.salary_amount is not None:
+        values["base_salary"] = Employee.base_salary + change.salary_amount
+    return values
+
+def preview_bulk_update(db: Session, employee_filter: EmployeeBulkFilter, change: EmployeeBulkChange) -> dict:
+    """Counts and salary totals for a dry run, from one aggregate query"""
+    new_salary = _new_values(change).get("base_salary")
+    matched, current_total, new_total = db.query(
+        func.count(Employee.id),
+        func.sum(Employee.base_salary),
+        func.sum(new_salary) if new_salary is not None else null(),
+    ).filter(*_conditions(employee_filter)).one()
+    return {
+        "matched": matched,
+        "current_salary_total": current_total,
+        "new_salary_total": new_total if new_salary is not None else None,
+    }
+
+def salaries_out_of_range(db: Session, employee_filter: EmployeeBulkFilter, change: EmployeeBulkChange) -> int:
+    """Number of matching employees whose salary would become negative or exceed MAX_SALARY"""
+    new_salary = _new_values(change).get("base_salary")
+    if new_salary is None:
+        return 0
+    return db.query(func.count(Employee.id)).filter(
+        *_conditions(employee_filter), or_(new_salary < 0, new_salary > MAX_SALARY)
+    ).scalar()
+
+def apply_bulk_update(
+    db: Session,
+    employee_filter: EmployeeBulkFilter,
+    change: EmployeeBulkChange,
+    changed_by: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> List[dict]:
+    """Apply the change to every matching employee with one UPDATE ... RETURNING per batch.
+
+    Batches of `batch_size` rows are committed one at a time and walked in id order, so a
+    row is never changed twice (a raise is applied once even if the filter still matches)
+    and huge reorganizations do not hold one long transaction. Each batch is audited and
+    its cached employees invalidated right after its commit, so a later batch failing
+    leaves the earlier ones fully recorded. Returns the updated employees.
+    """
+    batch_size = batch_size or settings.bulk_update_batch_size
+    values = _new_values(change)
+    conditions = _conditions(employee_filter)
+    changed_columns = [getattr(Employee, field) for field in values]
+
+    updated = []
+    last_id = 0
+    while True:
+        # The old values are only read for the audit log; the rows stay locked until the commit
+        old_rows = db.query(Employee.id, *changed_columns).filter(
+            *conditions, Employee.id > last_id
+        ).order_by(Employee.id).limit(batch_size).with_for_update().all()
+        if not old_rows:
+            break
+        ids = [row.id for row in old_rows]
+        new_rows = db.execute(
+            update(Employee).where(Employee.id.in_(ids)).values(**values).returning(*RETURNED_COLUMNS),
+            execution_options={"synchronize_session": False},
+        ).all()
+        db.commit()
+
+        new_by_id = {row.id: row._asdict() for row in new_rows}
+        for old in old_rows:
+            new = new_by_id[old.id]
+            audit_log.record("employee", old.id, diff_changes(old, {field: new[field] for field in values}), changed_by)
+            updated.append(new)
+        invalidate_employees((row.id, row.user_id) for row in new_rows)
+        invalidate_employee_search()
+        if change.department is not None:
+            invalidate_payroll_aggregates()
+        last_id = ids[-1]
+        if len(old_rows) < batch_size:
+            break
+    return updated
@@ -0,0 +1,131 @@
+import csv
+import io
+import secrets
+from datetime import datetime, timezone
+from typing import List, Tuple
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.employee import Employee
+from app.models.invitation import Invitation, InvitationStatus, INVITATION_EXPIRY
+from app.schemas.invitation import InvitationCreate, InvitationBulkError
+
+MAX_BULK_INVITATIONS = 1000
+
+def parse_invitations_csv(content: str) -> Tuple[List[Tuple[int, InvitationCreate]], List[InvitationBulkError]]:
+    """Parse a CSV export (header row required) into invitation payloads keyed by row number"""
+    rows = []
+    errors = []
+    reader = csv.DictReader(io.StringIO(content))
+    for row_number, raw in enumerate(reader, start=1):
+        # Empty cells mean "not provided" for the optional columns
+        data = {key.strip(): value.strip() for key, value in raw.items() if key and value and value.strip()}
+        try:
+            rows.append((row_number, InvitationCreate(**data)))
+        except ValidationError as e:
+            first_error = e.errors()[0]
+            field = ".".join(str(part) for part in first_error["loc"])
+            errors.append(InvitationBulkError(
+                row=row_number,
+                email=data.get("email"),
+                employee_id=data.get("employee_id"),
+                detail=f"{field}: {first_error['msg']}"
+            ))
+    return rows, errors
+
+def create_invitations_bulk(
+    db: Session,
+    rows: List[Tuple[int, InvitationCreate]]
+) -> Tuple[List[Invitation], List[InvitationBulkError]]:
+    """Validate a batch of invitations with set-based lookups and insert the valid ones in one statement.
+
+    An invitation for the same email or employee ID committed by a concurrent request after the
+    lookups is skipped by ON CONFLICT DO NOTHING and reported as an error for its row. The
+    returned invitations are detached with their values loaded, so reading them after the
+    commit costs no queries.
+    """
+    emails = {invitation.email for _, invitation in rows}
+    employee_ids = {invitation.employee_id for _, invitation in rows}
+
+    existing_user_emails = {
+        email for (email,) in db.query(User.email).filter(User.email.in_(emails))
+    }
+    existing_invitations = dict(
+        db.query(Invitation.email, Invitation.status).filter(Invitation.email.in_(emails))
+    )
+    existing_employee_ids = {
+        employee_id for (employee_id,) in
+        db.query(Employee.employee_id).filter(Employee.employee_id.in_(employee_ids))
+    }
+    invited_employee_ids = {
+        employee_id for (employee_id,) in
+        db.query(Invitation.employee_id).filter(Invitation.employee_id.in_(employee_ids))
+    }
+
+    errors = []
+    values = []
+    accepted = []
+    seen_emails = set()
+    seen_employee_ids = set()
+    expires_at = datetime.now(timezone.utc) + INVITATION_EXPIRY
+    for row_number, invitation in rows:
+        detail = None
+        if invitation.email in existing_user_emails:
+            detail = "User with this email already exists"
+        elif invitation.email in existing_invitations:
+            if existing_invitations[invitation.email] == InvitationStatus.PENDING:
+                detail = "Pending invitation already exists for this email"
+            else:
+                detail = "Invitation already exists for this email"
+        elif invitation.email in seen_emails:
+            detail = "Duplicate email in this batch"
+        elif invitation.employee_id in existing_employee_ids:
+            detail = "Employee ID already exists"
+        elif invitation.employee_id in invited_employee_ids:
+            detail = "Employee ID already exists in pending invitations"
+        elif invitation.employee_id in seen_employee_ids:
+            detail = "Duplicate employee ID in this batch"
+
+        if detail:
+            errors.append(InvitationBulkError(
+                row=row_number,
+                email=invitation.email,
+                employee_id=invitation.employee_id,
+                detail=detail
+            ))
+            continue
+
+        seen_emails.add(invitation.email)
+        seen_employee_ids.add(invitation.employee_id)
+        accepted.append((row_number, invitation))
+        values.append({
+            **invitation.dict(),
+            "token": secrets.token_urlsafe(32),
+            "status": InvitationStatus.PENDING,
+            "expires_at": expires_at,
+        })
+
+    created = []
+    if values:
+        if db.get_bind().dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(Invitation).on_conflict_do_nothing().returning(Invitation)
+        created = list(db.scalars(statement, values))
+        # Detached before the commit so that it does not expire them
+        for invitation in created:
+            db.expunge(invitation)
+        db.commit()
+
+        inserted = {invitation.email for invitation in created}
+        for row_number, invitation in accepted:
+            if invitation.email not in inserted:
+                errors.append(InvitationBulkError(
+                    row=row_number,
+                    email=invitation.email,
+                    employee_id=invitation.employee_id,
+                    detail="Invitation for this email or employee ID was created concurrently"
+                ))
+        errors.sort(key=lambda error: error.row)
+    return created, errors
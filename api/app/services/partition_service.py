@@ -0,0 +1,109 @@
+"""Monthly range partitions of the Postgres `attendance` table.
+
+The table is partitioned by `date` (see migration e7b3d5a9c1f4). Every month
+has its own partition named attendance_yYYYYmMM, and rows for months without
+one land in attendance_default until the month's partition is created.
+On other databases attendance is a plain table and these helpers do nothing.
+"""
+
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+PARENT_TABLE = "attendance"
+DEFAULT_PARTITION = "attendance_default"
+_PARTITION_NAME = re.compile(r"^attendance_y(\d{4})m(\d{2})$")
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"attendance_y{month.year}m{month.month:02d}"
+
+def is_attendance_partition(table: str) -> bool:
+    """Whether `table` is one of the partitions (attached or detached) rather than a model's table"""
+    return table == DEFAULT_PARTITION or _PARTITION_NAME.match(table) is not None
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": PARENT_TABLE}).scalar()
+
+def attendance_partitions(db: Session) -> List[Tuple[str, date]]:
+    """(name, first day of month) of every monthly partition, oldest first"""
+    names = db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table)"
+    ), {"table": PARENT_TABLE}).scalars()
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def _lock(db: Session):
+    # Workers starting at the same time must not race to create the same partition
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('attendance_partitions'))"))
+
+def _create_partition(db: Session, month: date):
+    name = partition_name(month)
+    bounds = {"lo": month, "hi": add_months(month, 1)}
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    # Rows already written for this month sit in the default partition; attaching would fail with them there
+    db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE date >= :lo AND date < :hi RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), bounds)
+    # Bounds are dates we computed, not user input
+    db.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['lo'].isoformat()}') TO ('{bounds['hi'].isoformat()}')"
+    ))
+
+def create_attendance_partitions(db: Session, through: date, start: Optional[date] = None) -> List[str]:
+    """Create the missing monthly partitions from `start` (default: this month) through `through`"""
+    if not is_partitioned(db):
+        return []
+    _lock(db)
+    existing = {name for name, _ in attendance_partitions(db)}
+    created = []
+    month = month_start(start or date.today())
+    while month <= through:
+        if partition_name(month) not in existing:
+            _create_partition(db, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    db.commit()
+    return created
+
+def ensure_future_attendance_partitions(db: Session, months_ahead: int) -> List[str]:
+    return create_attendance_partitions(db, add_months(month_start(date.today()), months_ahead))
+
+def detach_attendance_partitions(db: Session, before: date, drop: bool = False) -> List[str]:
+    """Detach monthly partitions that end on or before `before`.
+
+    Detached partitions stay behind as ordinary tables for archiving unless `drop` is set.
+    """
+    if not is_partitioned(db):
+        return []
+    _lock(db)
+    detached = []
+    for name, month in attendance_partitions(db):
+        if add_months(month, 1) > before:
+            break
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if drop:
+            db.execute(text(f"DROP TABLE {name}"))
+        detached.append(name)
+    db.commit()
+    return detached
@@ -0,0 +1,173 @@
+import threading
+from collections import defaultdict
+from datetime import date
+from typing import Callable, Dict, List, Optional, Set
+from sqlalchemy import distinct, func
+from sqlalchemy.orm import Session
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.lookups import lookup_cache
+from app.models.employee import Employee
+from app.models.salary import SalaryRecord
+from app.schemas.payroll import PayrollMonth, PayrollYear
+from app.services.archive_service import archived_years
+
+MAX_PAYROLL_YEARS = 20
+
+# Aggregates are computed and cached one year at a time. A closed year only changes when one
+# of its salary records (or, through month-over-month changes, one of the previous year's) is
+# edited, so each cached year is keyed by the edit counters of both years. Edits bump the
+# counters in every worker through lookup_cache invalidations; a worker only listens for the
+# years it has cached, and entries expire anyway in case a message is lost.
+_closed_year_cache = LRUCache(maxsize=1024, ttl=settings.closed_period_cache_seconds)
+_year_versions: Dict[int, int] = defaultdict(int)
+_watched_years: Set[int] = set()
+_versions_lock = threading.Lock()
+PAYROLL_CACHE_KEY = "payroll:aggregates"
+lookup_cache.on_invalidate(PAYROLL_CACHE_KEY, _closed_year_cache.clear)
+
+def _year_key(year: int) -> str:
+    return f"{PAYROLL_CACHE_KEY}:{year}"
+
+def _bump(year: int):
+    with _versions_lock:
+        _year_versions[year] += 1
+
+def _watch(year: int):
+    with _versions_lock:
+        if year in _watched_years:
+            return
+        _watched_years.add(year)
+    lookup_cache.on_invalidate(_year_key(year), lambda: _bump(year))
+
+def invalidate_payroll_aggregates(year: Optional[int] = None):
+    """Forget cached aggregates that depend on salary records of `year`, or all of them"""
+    lookup_cache.invalidate(PAYROLL_CACHE_KEY if year is None else _year_key(year))
+
+ARCHIVED_YEARS_DETAIL = "Salary records of {years} are in the cold archive, which payroll aggregates don't cover"
+
+def archived_payroll_years(start_year: int, end_year: int) -> List[int]:
+    """Years of the range whose salary records were moved to the cold archive, which aggregates don't cover"""
+    return [year for year in archived_years(SalaryRecord.__tablename__) if start_year <= year <= end_year]
+
+def _per_year(kind: str, start_year: int, end_year: int, filters: tuple, compute: Callable[[int], list]) -> list:
+    current_year = date.today().year
+    results = []
+    for year in range(start_year, end_year + 1):
+        if year >= current_year:
+            results += compute(year)
+            continue
+        # Listening before the key is read means an edit made during compute() is never missed
+        _watch(year - 1)
+        _watch(year)
+        key = (kind, year, _year_versions[year - 1], _year_versions[year]) + filters
+        rows = _closed_year_cache.get(key)
+        if rows is None:
+            rows = compute(year)
+            _closed_year_cache.set(key, rows)
+        results += rows
+    return results
+
+def _totals(db: Session, group_by: str, department: Optional[str], employee_id: Optional[int], *period):
+    """Sums per group and period over the salary records of the filtered employees"""
+    group = (Employee.department if group_by == "department" else SalaryRecord.employee_id).label("group_key")
+    overtime = func.coalesce(SalaryRecord.overtime_amount, 0)
+    bonus = func.coalesce(SalaryRecord.bonus, 0)
+    deductions = func.coalesce(SalaryRecord.deductions, 0)
+    query = db.query(
+        group,
+        *period,
+        func.count(distinct(SalaryRecord.employee_id)).label("employees"),
+        func.sum(SalaryRecord.base_amount).label("base_amount"),
+        func.sum(overtime).label("overtime_amount"),
+        func.sum(bonus).label("bonus"),
+        func.sum(deductions).label("deductions"),
+        func.sum(SalaryRecord.base_amount + overtime + bonus).label("gross_amount"),
+        func.sum(SalaryRecord.net_amount).label("net_amount"),
+    )
+    if group_by == "department" or department:
+        query = query.join(Employee, Employee.id == SalaryRecord.employee_id)
+    if department:
+        query = query.filter(Employee.department == department)
+    if employee_id is not None:
+        query = query.filter(SalaryRecord.employee_id == employee_id)
+    return query.group_by(group, *period)
+
+def _group_fields(group_by: str, group_key) -> dict:
+    return {"department": group_key} if group_by == "department" else {"employee_id": group_key}
+
+def payroll_by_month(
+    db: Session,
+    start_year: int,
+    end_year: int,
+    group_by: str = "department",
+    department: Optional[str] = None,
+    employee_id: Optional[int] = None,
+) -> List[PayrollMonth]:
+    """Monthly totals per department or employee with year-to-date running sums and month-over-month change"""
+    filters = (group_by, department, employee_id)
+    return _per_year(
+        "monthly", start_year, end_year, filters,
+        lambda year: _payroll_by_month(db, year, group_by, department, employee_id),
+    )
+
+def _payroll_by_month(db, year, group_by, department, employee_id):
+    # The previous year is included so January's change is relative to December
+    months = _totals(
+        db, group_by, department, employee_id, SalaryRecord.year.label("year"), SalaryRecord.month.label("month")
+    ).filter(SalaryRecord.year.in_((year - 1, year))).subquery()
+
+    def year_to_date(column):
+        return func.sum(column).over(partition_by=[months.c.group_key, months.c.year], order_by=months.c.month)
+
+    previous_net = func.lag(months.c.net_amount).over(
+        partition_by=months.c.group_key, order_by=[months.c.year, months.c.month]
+    )
+    windowed = db.query(
+        months,
+        year_to_date(months.c.gross_amount).label("ytd_gross_amount"),
+        year_to_date(months.c.net_amount).label("ytd_net_amount"),
+        year_to_date(months.c.bonus).label("ytd_bonus"),
+        year_to_date(months.c.deductions).label("ytd_deductions"),
+        (months.c.net_amount - previous_net).label("net_change"),
+    ).subquery()
+
+    rows = db.query(windowed).filter(windowed.c.year == year).order_by(
+        windowed.c.month, windowed.c.group_key
+    ).all()
+    return [
+        PayrollMonth(**_group_fields(group_by, row.group_key), **{
+            key: value for key, value in row._asdict().items() if key != "group_key"
+        })
+        for row in rows
+    ]
+
+def payroll_by_year(
+    db: Session,
+    start_year: int,
+    end_year: int,
+    group_by: str = "department",
+    department: Optional[str] = None,
+    employee_id: Optional[int] = None,
+) -> List[PayrollYear]:
+    """Yearly totals per department or employee with the change in net amount from the previous year"""
+    filters = (group_by, department, employee_id)
+    return _per_year(
+        "yearly", start_year, end_year, filters,
+        lambda year: _payroll_by_year(db, year, group_by, department, employee_id),
+    )
+
+def _payroll_by_year(db, year, group_by, department, employee_id):
+    years = _totals(
+        db, group_by, department, employee_id, SalaryRecord.year.label("year")
+    ).filter(SalaryRecord.year.in_((year - 1, year))).subquery()
+    previous_net = func.lag(years.c.net_amount).over(partition_by=years.c.group_key, order_by=years.c.year)
+    windowed = db.query(years, (years.c.net_amount - previous_net).label("net_change")).subquery()
+
+    rows = db.query(windowed).filter(windowed.c.year == year).order_by(windowed.c.group_key).all()
+    return [
+        PayrollYear(**_group_fields(group_by, row.group_key), **{
+            key: value for key, value in row._asdict().items() if key != "group_key"
+        })
+        for row in rows
+    ]
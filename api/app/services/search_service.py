@@ -0,0 +1,174 @@
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Set
+from sqlalchemy import case, func, literal, literal_column, or_
+from sqlalchemy.orm import Session
+from app.models.employee import Employee
+from app.models.user import User
+from app.schemas.employee import EmployeeSearchResult
+
+# Minimum share of the query's trigrams a record needs to count as a fuzzy match
+# (pg_trgm's default word_similarity_threshold)
+MIN_SIMILARITY = 0.6
+EXACT_ID_BOOST = 2.0
+PREFIX_BOOST = 1.0
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+def search_document():
+    """Searchable text for an employee; mirrors the ix_employees_search_trgm index expression"""
+    space = literal_column("' '")
+    return func.lower(
+        Employee.first_name + space + Employee.last_name + space + Employee.employee_id + space
+        + func.coalesce(Employee.department, literal_column("''")) + space
+        + func.coalesce(Employee.position, literal_column("''"))
+    )
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def search_employees(db: Session, query: str, limit: int = 20) -> List[EmployeeSearchResult]:
+    query = query.strip().lower()
+    if not query:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        return _search_postgres(db, query, limit)
+    return employee_search_index.search(db, query, limit)
+
+def _search_postgres(db: Session, query: str, limit: int) -> List[EmployeeSearchResult]:
+    document = search_document()
+    email = func.lower(User.email)
+    contains = f"%{_escape_like(query)}%"
+    prefix = f"{_escape_like(query)}%"
+
+    # Each branch can use its own trigram index; UNION combines the candidates
+    document_matches = db.query(Employee.id.label("id")).filter(or_(
+        literal(query).op("<%")(document),
+        document.like(contains, escape="\\"),
+    ))
+    email_matches = db.query(Employee.id.label("id")).join(User, User.id == Employee.user_id).filter(or_(
+        literal(query).op("<%")(email),
+        email.like(contains, escape="\\"),
+    ))
+    candidates = document_matches.union(email_matches).subquery()
+
+    starts_with_query = or_(
+        func.lower(Employee.first_name).like(prefix, escape="\\"),
+        func.lower(Employee.last_name).like(prefix, escape="\\"),
+        func.lower(Employee.employee_id).like(prefix, escape="\\"),
+        email.like(prefix, escape="\\"),
+    )
+    score = (
+        func.greatest(func.word_similarity(query, document), func.word_similarity(query, email))
+        + case((func.lower(Employee.employee_id) == query, EXACT_ID_BOOST), else_=0)
+        + case((starts_with_query, PREFIX_BOOST), else_=0)
+    ).label("score")
+
+    rows = db.query(
+        Employee.id,
+        Employee.employee_id,
+        Employee.first_name,
+        Employee.last_name,
+        User.email,
+        Employee.department,
+        Employee.position,
+        score,
+    ).join(candidates, candidates.c.id == Employee.id).join(User, User.id == Employee.user_id).order_by(
+        score.desc(), Employee.last_name, Employee.first_name
+    ).limit(limit).all()
+
+    return [EmployeeSearchResult(**row._mapping, score=round(float(row.score), 4)) for row in rows]
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams in the same shape pg_trgm produces: per word, padded with two leading and one trailing space"""
+    result = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+class EmployeeSearchIndex:
+    """In-process trigram index used where pg_trgm isn't available (SQLite)"""
+
+    def __init__(self, max_age_seconds: float = 60.0):
+        self.max_age_seconds = max_age_seconds
+        self._records: Dict[int, dict] = {}
+        self._texts: Dict[int, str] = {}
+        self._prefixes: Dict[int, tuple] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._built_at = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._built_at = None
+
+    def _ensure_built(self, db: Session):
+        if self._built_at is not None and time.monotonic() - self._built_at < self.max_age_seconds:
+            return
+        with self._lock:
+            if self._built_at is not None and time.monotonic() - self._built_at < self.max_age_seconds:
+                return
+            rows = db.query(
+                Employee.id,
+                Employee.employee_id,
+                Employee.first_name,
+                Employee.last_name,
+                User.email,
+                Employee.department,
+                Employee.position,
+            ).join(User, User.id == Employee.user_id).all()
+
+            records, texts, prefixes, postings = {}, {}, {}, defaultdict(set)
+            for row in rows:
+                record = dict(row._mapping)
+                text = " ".join(str(value) for key, value in record.items() if key != "id" and value).lower()
+                records[row.id] = record
+                texts[row.id] = text
+                prefixes[row.id] = tuple(
+                    (record[field] or "").lower() for field in ("employee_id", "first_name", "last_name", "email")
+                )
+                for trigram in trigrams(text):
+                    postings[trigram].add(row.id)
+            self._records, self._texts, self._prefixes, self._postings = records, texts, prefixes, postings
+            self._built_at = time.monotonic()
+
+    def search(self, db: Session, query: str, limit: int) -> List[EmployeeSearchResult]:
+        self._ensure_built(db)
+        records, texts, prefixes, postings = self._records, self._texts, self._prefixes, self._postings
+
+        query_trigrams = trigrams(query)
+        lists = sorted((postings.get(trigram, set()) for trigram in query_trigrams), key=len)
+        # A record sharing at least `needed` trigrams must appear in one of the
+        # len - needed + 1 rarest posting lists, so common trigrams never get scanned
+        needed = max(math.ceil(len(lists) * MIN_SIMILARITY), 1)
+        shared = Counter()
+        for posting in lists[:len(lists) - needed + 1]:
+            shared.update(posting)
+        for employee_id in list(shared):
+            shared[employee_id] = sum(1 for posting in lists if employee_id in posting)
+        candidates = {employee_id for employee_id, count in shared.items() if count >= needed}
+        if len(query) < 3 or not candidates:
+            # Trigrams say little about very short queries; fall back to a substring scan
+            candidates |= {employee_id for employee_id, text in texts.items() if query in text}
+
+        def score(employee_id: int) -> float:
+            fields = prefixes[employee_id]
+            value = shared[employee_id] / len(query_trigrams) if query_trigrams else 0.0
+            if fields[0] == query:
+                value += EXACT_ID_BOOST
+            if any(field.startswith(query) for field in fields):
+                value += PREFIX_BOOST
+            return value
+
+        scored = ((score(employee_id), employee_id) for employee_id in candidates)
+        top = heapq.nlargest(limit, scored, key=lambda item: (item[0], -item[1]))
+        return [EmployeeSearchResult(**records[employee_id], score=round(value, 4)) for value, employee_id in top]
+
+employee_search_index = EmployeeSearchIndex()
+
+def invalidate_employee_search():
+    employee_search_index.invalidate()
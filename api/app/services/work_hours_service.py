@@ -0,0 +1,129 @@
+import calendar
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Optional, Sequence
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.sql_functions import hours_between, period_start
+from app.models.attendance import Attendance
+from app.models.employee import Employee
+from app.models.salary import SalaryRecord, SalaryStatus
+from app.schemas.work_hours import WorkHoursSummary
+from app.services.audit_service import audit_log, diff_changes
+
+CENTS = Decimal("0.01")
+
+def hourly_rate(base_salary: Optional[Decimal]) -> Decimal:
+    if not base_salary:
+        return Decimal(0)
+    return Decimal(base_salary) / Decimal(str(settings.standard_monthly_hours))
+
+def overtime_pay(base_salary: Optional[Decimal], overtime_hours: float) -> Decimal:
+    multiplier = Decimal(str(settings.overtime_rate_multiplier))
+    pay = hourly_rate(base_salary) * multiplier * Decimal(str(overtime_hours))
+    return pay.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+def work_hours(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    period: str = "month",
+    employee_ids: Optional[Sequence[int]] = None,
+    department: Optional[str] = None,
+) -> List[WorkHoursSummary]:
+    """Hours, overtime and overtime pay per employee and period for the whole workforce in one query"""
+    threshold = settings.overtime_daily_threshold_hours
+
+    daily = db.query(
+        Attendance.employee_id.label("employee_id"),
+        Attendance.date.label("date"),
+        func.sum(hours_between(Attendance.check_in_time, Attendance.check_out_time)).label("hours"),
+    ).filter(
+        Attendance.date >= start_date,
+        Attendance.date <= end_date,
+        Attendance.check_in_time.isnot(None),
+        Attendance.check_out_time.isnot(None),
+    )
+    if employee_ids:
+        daily = daily.filter(Attendance.employee_id.in_(employee_ids))
+    daily = daily.group_by(Attendance.employee_id, Attendance.date).subquery()
+
+    bucket = period_start(daily.c.date, period)
+    overtime = case((daily.c.hours > threshold, daily.c.hours - threshold), else_=0)
+    query = db.query(
+        daily.c.employee_id,
+        bucket.label("period_start"),
+        func.count().label("days_worked"),
+        func.sum(daily.c.hours).label("hours"),
+        func.sum(overtime).label("overtime_hours"),
+        Employee.base_salary,
+    ).join(Employee, Employee.id == daily.c.employee_id)
+    if department:
+        query = query.filter(Employee.department == department)
+    rows = query.group_by(daily.c.employee_id, bucket, Employee.base_salary).order_by(
+        daily.c.employee_id, bucket
+    ).all()
+
+    results = []
+    for row in rows:
+        hours = float(row.hours or 0)
+        overtime_hours = float(row.overtime_hours or 0)
+        results.append(WorkHoursSummary(
+            employee_id=row.employee_id,
+            period_start=row.period_start,
+            days_worked=row.days_worked,
+            hours=round(hours, 2),
+            regular_hours=round(hours - overtime_hours, 2),
+            overtime_hours=round(overtime_hours, 2),
+            overtime_pay=overtime_pay(row.base_salary, overtime_hours),
+        ))
+    return results
+
+def apply_overtime_to_salary_records(db: Session, year: int, month: int, changed_by: Optional[int] = None) -> int:
+    """Write computed overtime into the month's pending salary records and recompute their net amount.
+
+    Only employees with completed check-ins that month are updated: without attendance there is
+    nothing computed, and overtime entered by hand on their records is left as it is.
+    """
+    start_date = date(year, month, 1)
+    end_date = date(year, month, calendar.monthrange(year, month)[1])
+    overtime_by_employee = {
+        summary.employee_id: summary.overtime_pay
+        for summary in work_hours(db, start_date, end_date, period="month")
+    }
+    if not overtime_by_employee:
+        return 0
+
+    records = db.query(
+        SalaryRecord.id,
+        SalaryRecord.employee_id,
+        SalaryRecord.base_amount,
+        SalaryRecord.overtime_amount,
+        SalaryRecord.bonus,
+        SalaryRecord.deductions,
+        SalaryRecord.net_amount,
+    ).filter(
+        SalaryRecord.year == year,
+        SalaryRecord.month == month,
+        SalaryRecord.status == SalaryStatus.PENDING,
+        SalaryRecord.employee_id.in_(overtime_by_employee),
+    ).all()
+
+    changes = []
+    audited = []
+    for record in records:
+        overtime_amount = overtime_by_employee[record.employee_id]
+        values = {
+            "overtime_amount": overtime_amount,
+            "net_amount": record.base_amount + overtime_amount + (record.bonus or 0) - (record.deductions or 0),
+        }
+        changes.append({"id": record.id, **values})
+        audited.append((record.id, diff_changes(record, values)))
+
+    if changes:
+        db.execute(update(SalaryRecord), changes)
+        db.commit()
+        for record_id, diff in audited:
+            audit_log.record("salary_record", record_id, diff, changed_by)
+    return len(changes)
@@ -0,0 +1,221 @@
+import csv
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.models.employee import Employee
+from app.models.invitation import Invitation, InvitationStatus
+from app.schemas.workforce import WorkforceImportRow, WorkforceImportError, WorkforceCredential
+from app.services.search_service import invalidate_employee_search
+
+USER_FIELDS = ("username", "email", "role")
+ParsedRow = Tuple[int, Union[WorkforceImportRow, WorkforceImportError]]
+
+class WorkforceImportInterrupted(Exception):
+    """An import that failed part-way; `result` holds what was committed before the failure"""
+
+    def __init__(self, result: dict):
+        super().__init__(result["stopped"])
+        self.result = result
+
+def iter_workforce_csv(stream: TextIO) -> Iterator[ParsedRow]:
+    """Parse a CSV (header row required) one row at a time, yielding the row or why it is invalid"""
+    reader = csv.DictReader(stream)
+    for row_number, raw in enumerate(reader, start=1):
+        # Empty cells mean "not provided" for the optional columns
+        data = {key.strip(): value.strip() for key, value in raw.items() if key and value and value.strip()}
+        try:
+            yield row_number, WorkforceImportRow(**data)
+        except ValidationError as e:
+            first_error = e.errors()[0]
+            field = ".".join(str(part) for part in first_error["loc"])
+            yield row_number, WorkforceImportError(
+                row=row_number,
+                username=data.get("username"),
+                employee_id=data.get("employee_id"),
+                detail=f"{field}: {first_error['msg']}"
+            )
+
+class _Seen:
+    """Keys claimed by earlier rows of the same import"""
+
+    def __init__(self):
+        self.usernames = set()
+        self.emails = set()
+        self.employee_ids = set()
+
+    def add(self, row: WorkforceImportRow):
+        self.usernames.add(row.username)
+        self.emails.add(row.email)
+        self.employee_ids.add(row.employee_id)
+
+def _conflicts(db: Session, rows: List[Tuple[int, WorkforceImportRow]], seen: _Seen) -> List[Tuple[int, WorkforceImportRow, Optional[str]]]:
+    """Check a batch against the database with one set-based lookup per key"""
+    usernames = {row.username for _, row in rows}
+    emails = {row.email for _, row in rows}
+    employee_ids = {row.employee_id for _, row in rows}
+    existing_usernames = {name for (name,) in db.query(User.username).filter(User.username.in_(usernames))}
+    existing_emails = {email for (email,) in db.query(User.email).filter(User.email.in_(emails))}
+    invited_emails = {
+        email for (email,) in db.query(Invitation.email).filter(
+            Invitation.email.in_(emails), Invitation.status == InvitationStatus.PENDING
+        )
+    }
+    existing_employee_ids = {
+        employee_id for (employee_id,) in db.query(Employee.employee_id).filter(Employee.employee_id.in_(employee_ids))
+    }
+    invited_employee_ids = {
+        employee_id for (employee_id,) in db.query(Invitation.employee_id).filter(Invitation.employee_id.in_(employee_ids))
+    }
+
+    checked = []
+    for row_number, row in rows:
+        detail = None
+        if row.username in existing_usernames:
+            detail = "Username already registered"
+        elif row.username in seen.usernames:
+            detail = "Duplicate username in this import"
+        elif row.email in existing_emails:
+            detail = "User with this email already exists"
+        elif row.email in invited_emails:
+            detail = "Pending invitation already exists for this email"
+        elif row.email in seen.emails:
+            detail = "Duplicate email in this import"
+        elif row.employee_id in existing_employee_ids:
+            detail = "Employee ID already exists"
+        elif row.employee_id in invited_employee_ids:
+            detail = "Employee ID already exists in pending invitations"
+        elif row.employee_id in seen.employee_ids:
+            detail = "Duplicate employee ID in this import"
+        if not detail:
+            seen.add(row)
+        checked.append((row_number, row, detail))
+    return checked
+
+def _insert(db: Session, rows: List[WorkforceImportRow], hashes: List[str]):
+    users = [
+        {**row.dict(include=set(USER_FIELDS)), "hashed_password": hashed, "is_active": True}
+        for row, hashed in zip(rows, hashes)
+    ]
+    user_ids = db.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), users).all()
+    employees = [
+        {**row.dict(exclude={"password", *USER_FIELDS}), "user_id": user_id}
+        for row, user_id in zip(rows, user_ids)
+    ]
+    db.execute(insert(Employee), employees)
+
+def _import_batch(
+    db: Session, batch: List[ParsedRow], seen: _Seen, pool: ThreadPoolExecutor
+) -> Tuple[int, List[WorkforceImportError], List[WorkforceCredential]]:
+    errors = [parsed for _, parsed in batch if isinstance(parsed, WorkforceImportError)]
+    valid = [(row_number, parsed) for row_number, parsed in batch if isinstance(parsed, WorkforceImportRow)]
+    accepted = []
+    for row_number, row, detail in _conflicts(db, valid, seen) if valid else []:
+        if detail:
+            errors.append(WorkforceImportError(row=row_number, username=row.username, employee_id=row.employee_id, detail=detail))
+        else:
+            accepted.append((row_number, row))
+    if not accepted:
+        return 0, errors, []
+
+    credentials = []
+    passwords = []
+    for row_number, row in accepted:
+        if row.password is None:
+            row.password = secrets.token_urlsafe(12)
+            credentials.append(WorkforceCredential(row=row_number, username=row.username, password=row.password))
+        passwords.append(row.password)
+    hashes = list(pool.map(get_password_hash, passwords))
+
+    rows = [row for _, row in accepted]
+    try:
+        _insert(db, rows, hashes)
+        db.commit()
+        return len(rows), errors, credentials
+    except IntegrityError:
+        # Someone created a conflicting user or employee since the lookup: isolate the offending rows
+        db.rollback()
+
+    created = 0
+    failed = set()
+    for (row_number, row), hashed in zip(accepted, hashes):
+        try:
+            with db.begin_nested():
+                _insert(db, [row], [hashed])
+            created += 1
+        except IntegrityError:
+            failed.add(row_number)
+            errors.append(WorkforceImportError(
+                row=row_number, username=row.username, employee_id=row.employee_id,
+                detail="Conflicts with an existing user or employee"
+            ))
+    db.commit()
+    return created, errors, [credential for credential in credentials if credential.row not in failed]
+
+def import_workforce(
+    db: Session,
+    rows: Iterable[ParsedRow],
+    start_after_row: int = 0,
+    batch_size: Optional[int] = None,
+    on_checkpoint: Optional[Callable[[int, List[WorkforceCredential]], None]] = None,
+) -> dict:
+    """Create a user and an employee for every valid row, committing one batch at a time.
+
+    Passwords of a batch are hashed concurrently before its users and employees are inserted
+    with one statement each. After every commit `on_checkpoint(last_row, credentials)` is
+    called, so an interrupted import can be resumed with `start_after_row=last_row`.
+    A failure rolls back the current batch and raises WorkforceImportInterrupted with the
+    result up to the last committed batch, the error being its __cause__.
+    """
+    batch_size = batch_size or settings.workforce_import_batch_size
+    created = 0
+    last_row = start_after_row
+    errors: List[WorkforceImportError] = []
+    credentials: List[WorkforceCredential] = []
+    seen = _Seen()
+
+    def flush(batch: List[ParsedRow]):
+        nonlocal created, last_row
+        batch_created, batch_errors, batch_credentials = _import_batch(db, batch, seen, pool)
+        created += batch_created
+        errors.extend(batch_errors)
+        credentials.extend(batch_credentials)
+        last_row = batch[-1][0]
+        if on_checkpoint is not None:
+            on_checkpoint(last_row, batch_credentials)
+
+    def result(stopped: Optional[str] = None) -> dict:
+        if created:
+            invalidate_employee_search()
+        return {
+            "created": created, "last_row": last_row, "errors": errors, "credentials": credentials, "stopped": stopped,
+        }
+
+    with ThreadPoolExecutor(max_workers=settings.workforce_hash_workers or os.cpu_count()) as pool:
+        batch: List[ParsedRow] = []
+        try:
+            for row_number, parsed in rows:
+                if row_number <= start_after_row:
+                    continue
+                batch.append((row_number, parsed))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+        except Exception as exc:
+            db.rollback()
+            if isinstance(exc, UnicodeDecodeError):
+                stopped = f"CSV file must be UTF-8 encoded (after row {last_row})"
+            else:
+                stopped = f"Import stopped after row {last_row}: {type(exc).__name__}"
+            raise WorkforceImportInterrupted(result(stopped)) from exc
+
+    return result()
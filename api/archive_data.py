@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Move closed years of attendance and salary records into the cold archive.
+
+Usage:
+    python archive_data.py [--before-year 2022] [--table attendance|salary_records]
+
+Years before --before-year (default: current year - ARCHIVE_KEEP_YEARS) are
+written to compressed Parquet files under ARCHIVE_DIR and deleted from the
+database. Archived rows are still returned by the employee attendance and
+salary record endpoints.
+"""
+
+import argparse
+import sys
+from datetime import date
+from sqlalchemy import func
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.attendance import Attendance
+from app.models.salary import SalaryRecord
+from app.services.archive_service import ARCHIVED_MODELS, archive_year
+from app.services.payroll_service import invalidate_payroll_aggregates
+
+def oldest_year(db, table: str):
+    if table == Attendance.__tablename__:
+        oldest = db.query(func.min(Attendance.date)).scalar()
+        return oldest.year if oldest else None
+    return db.query(func.min(SalaryRecord.year)).scalar()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--before-year", type=int, default=date.today().year - settings.archive_keep_years)
+    parser.add_argument("--table", choices=sorted(ARCHIVED_MODELS), action="append")
+    args = parser.parse_args()
+
+    if args.before_year > date.today().year:
+        print("❌ Only closed years can be archived")
+        return 1
+
+    db = SessionLocal()
+    try:
+        for table in args.table or sorted(ARCHIVED_MODELS):
+            first = oldest_year(db, table)
+            if first is None:
+                continue
+            for year in range(first, args.before_year):
+                moved = archive_year(db, table, year)
+                if moved:
+                    print(f"✅ {table} {year}: archived {moved} rows")
+                    if table == SalaryRecord.__tablename__:
+                        # The following year's aggregates compared against this one
+                        invalidate_payroll_aggregates(year)
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Compare attendance scan times on a plain table and a monthly-partitioned one (Postgres only).
+
+Usage:
+    uv run python benchmarks/attendance_partitions.py [--employees 500] [--years 5] [--runs 5] [--keep]
+
+Both tables are built in a scratch schema from the same generated dataset
+(employees x every day of the last N years) with the same (employee_id, date)
+index, then the date-filtered queries used by the attendance routes and
+analytics are timed with EXPLAIN ANALYZE. The report shows the median
+execution time and how many partitions the planner kept after pruning.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+from datetime import date
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services.partition_service import add_months, month_start  # noqa: E402
+
+SCHEMA = "bench_partitions"
+COLUMNS = """
+    id BIGINT NOT NULL,
+    employee_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    check_in_time TIMESTAMP,
+    check_out_time TIMESTAMP,
+    status TEXT NOT NULL,
+    notes TEXT
+"""
+
+def build(conn, employees: int, years: int):
+    today = date.today()
+    first = add_months(month_start(today), -12 * years)
+    last = add_months(month_start(today), 1)
+
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS}, PRIMARY KEY (id))"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.partitioned ({COLUMNS}, PRIMARY KEY (id, date)) PARTITION BY RANGE (date)"))
+    month = first
+    while month < last:
+        following = add_months(month, 1)
+        conn.execute(text(
+            f"CREATE TABLE {SCHEMA}.partitioned_y{month.year}m{month.month:02d} PARTITION OF {SCHEMA}.partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        ))
+        month = following
+
+    generate = """
+        SELECT row_number() OVER (), e, d::date,
+               d + interval '8 hours' + (random() * interval '90 minutes'),
+               d + interval '16 hours' + (random() * interval '3 hours'),
+               CASE WHEN random() < 0.1 THEN 'absent' WHEN random() < 0.05 THEN 'vacation' ELSE 'present' END,
+               NULL
+        FROM generate_series(1, :employees) AS e,
+             generate_series(CAST(:first AS date), CAST(:last AS date) - 1, interval '1 day') AS d
+    """
+    params = {"employees": employees, "first": first, "last": last}
+    conn.execute(text(f"INSERT INTO {SCHEMA}.plain {generate}"), params)
+    conn.execute(text(f"INSERT INTO {SCHEMA}.partitioned SELECT * FROM {SCHEMA}.plain"))
+    for table in ("plain", "partitioned"):
+        conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{table} (employee_id, date)"))
+        conn.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+    return conn.execute(text(f"SELECT count(*) FROM {SCHEMA}.plain")).scalar()
+
+def queries(employees: int):
+    today = date.today()
+    month = month_start(today)
+    return [
+        ("check-in lookup (one employee, today)",
+         "SELECT * FROM {table} WHERE employee_id = :employee AND date = :today",
+         {"employee": employees // 2, "today": today}),
+        ("my-attendance (one employee, one month)",
+         "SELECT * FROM {table} WHERE employee_id = :employee AND date >= :start AND date <= :end ORDER BY date DESC",
+         {"employee": employees // 2, "start": month, "end": today}),
+        ("department analytics (all employees, one month)",
+         "SELECT status, count(*) FROM {table} WHERE date >= :start AND date < :end GROUP BY status",
+         {"start": add_months(month, -1), "end": month}),
+        ("quarter report (all employees, three months)",
+         "SELECT employee_id, count(*) FROM {table} WHERE date >= :start AND date < :end GROUP BY employee_id",
+         {"start": add_months(month, -3), "end": month}),
+    ]
+
+def _scanned_relations(plan: dict) -> int:
+    count = 1 if "Relation Name" in plan else 0
+    return count + sum(_scanned_relations(child) for child in plan.get("Plans", []))
+
+def measure(conn, sql: str, params: dict, runs: int):
+    timings = []
+    for _ in range(runs):
+        result = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"), params).scalar()
+        timings.append(result[0]["Execution Time"])
+    return statistics.median(timings), _scanned_relations(result[0]["Plan"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.database_url)
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if engine.dialect.name != "postgresql":
+        print("❌ This benchmark needs Postgres")
+        return 1
+
+    with engine.begin() as conn:
+        print(f"Building {args.employees} employees x {args.years} years ...")
+        rows = build(conn, args.employees, args.years)
+        print(f"{rows:,} rows per table\n")
+
+    try:
+        with engine.connect() as conn:
+            print(f"{'query':<50} {'plain ms':>10} {'partitioned ms':>15} {'partitions scanned':>19}")
+            for label, sql, params in queries(args.employees):
+                plain, _ = measure(conn, sql.format(table=f"{SCHEMA}.plain"), params, args.runs)
+                partitioned, scanned = measure(conn, sql.format(table=f"{SCHEMA}.partitioned"), params, args.runs)
+                print(f"{label:<50} {plain:>10.2f} {partitioned:>15.2f} {scanned:>19}")
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Measure cold import time of the API and CLI entry points with `python -X importtime`.
+
+Usage:
+    uv run python benchmarks/import_time.py [--runs 5] [--top 15] [module ...]
+
+Each module is imported in a fresh interpreter several times; the median
+cumulative time is reported together with the slowest top-level imports of the
+last run.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["app.main", "app.models", "app.core.database", "create_admin"]
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_once(module: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = line.replace("import time:", "|", 1).split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return entries
+
+def measure(module: str, runs: int, top: int):
+    totals = []
+    entries = []
+    for _ in range(runs):
+        entries = import_once(module)
+        totals.append(sum(self_us for _, _, self_us, _ in entries))
+
+    print(f"{module}: median {statistics.median(totals) / 1000:.1f} ms over {runs} runs "
+          f"(min {min(totals) / 1000:.1f} ms, {len(entries)} modules)")
+    # Depth 1 entries are the imports the profiled module pulled in directly
+    direct = [(name, cumulative) for name, depth, _, cumulative in entries if depth == 1]
+    for name, cumulative in sorted(direct, key=lambda entry: entry[1], reverse=True)[:top]:
+        print(f"    {cumulative / 1000:8.1f} ms  {name}")
+    print()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        measure(module, args.runs, args.top)
+
+if __name__ == "__main__":
+    main()
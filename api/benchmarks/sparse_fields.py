@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Compare full and sparse-fieldset responses of the list endpoints.
+
+Usage:
+    uv run python benchmarks/sparse_fields.py [--employees 20000] [--runs 5] [--url URL]
+
+A scratch database (a temporary SQLite file unless --url points at an empty
+database) is filled with generated users, employees and invitations, and each
+list endpoint is requested in-process with and without `fields=`. The report
+shows the median latency and the response size of both variants.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.core.auth import require_admin  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.core.replicas import get_read_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Employee, Invitation, User  # noqa: E402
+from app.models.invitation import InvitationStatus  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+
+DEPARTMENTS = ["Engineering", "Sales", "Support", "Finance", "Operations"]
+
+CASES = [
+    ("employees table view", "/api/admin/employees", "id,first_name,last_name,department,position"),
+    ("employees with user", "/api/admin/employees", "id,first_name,last_name,user"),
+    ("users picker", "/api/admin/users", "id,username"),
+    ("invitations list", "/api/admin/invitations", "id,email,status"),
+]
+
+def seed(engine, employees: int):
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com",
+             "hashed_password": "x" * 60, "role": UserRole.EMPLOYEE, "is_active": True}
+            for i in range(1, employees + 1)
+        ])
+        conn.execute(insert(Employee), [
+            {"user_id": i, "employee_id": f"EMP{i:06d}", "first_name": f"First{i}", "last_name": f"Last{i}",
+             "phone": "+1 555 0100", "address": f"{i} Long Street Name, Apartment {i % 90}, Some City, 12345",
+             "date_of_birth": date(1980, 1, 1) + timedelta(days=i % 7000),
+             "hire_date": date(2015, 1, 1) + timedelta(days=i % 3000),
+             "department": DEPARTMENTS[i % len(DEPARTMENTS)], "position": "Specialist", "base_salary": 50000 + i % 1000}
+            for i in range(1, employees + 1)
+        ])
+        conn.execute(insert(Invitation), [
+            {"email": f"invite{i}@example.com", "token": f"token{i}", "status": InvitationStatus.PENDING,
+             "employee_id": f"INV{i:06d}", "hire_date": date(2025, 1, 1), "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+             "position": "Specialist", "base_salary": 50000, "expires_at": now + timedelta(days=7)}
+            for i in range(1, max(employees // 10, 1) + 1)
+        ])
+
+def measure(client: TestClient, path: str, params: dict, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = client.get(path, params=params)
+        timings.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return statistics.median(timings), len(response.content)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Empty scratch database to use instead of a temporary SQLite file")
+    parser.add_argument("--employees", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    scratch = None
+    if args.url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        args.url = f"sqlite:///{scratch.name}"
+    engine = create_engine(args.url)
+    Session = sessionmaker(bind=engine)
+
+    def scratch_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    try:
+        print(f"Seeding {args.employees:,} employees ...")
+        seed(engine, args.employees)
+        app.dependency_overrides[get_read_db] = scratch_db
+        app.dependency_overrides[require_admin] = lambda: None
+        client = TestClient(app)
+
+        print(f"\n{'case':<24} {'full ms':>9} {'sparse ms':>10} {'full KB':>9} {'sparse KB':>10} {'size':>6}")
+        for label, path, fields in CASES:
+            full_ms, full_bytes = measure(client, path, {}, args.runs)
+            sparse_ms, sparse_bytes = measure(client, path, {"fields": fields}, args.runs)
+            print(
+                f"{label:<24} {full_ms:>9.1f} {sparse_ms:>10.1f} {full_bytes / 1024:>9.0f} "
+                f"{sparse_bytes / 1024:>10.0f} {sparse_bytes / full_bytes:>6.0%}"
+            )
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
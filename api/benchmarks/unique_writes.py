@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Count database round trips of the account-creating endpoints and race duplicate writes.
+
+Usage:
+    uv run python benchmarks/unique_writes.py [--concurrency 8] [--url URL]
+
+Against a scratch database (a temporary SQLite file unless --url points at an
+empty database) each endpoint is called once with new data and once with a
+duplicate, counting the SQL statements it sends. Then the same registration
+is sent from several threads at once: exactly one must succeed and the others
+must get the usual 400, never a 500.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from collections import Counter
+from datetime import date
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.core.auth import require_admin  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import Base, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Invitation, User  # noqa: E402
+
+def invitation_payload(n: int) -> dict:
+    return {"email": f"invitee{n}@example.com", "employee_id": f"INV{n}", "hire_date": date.today().isoformat()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Empty scratch database to use instead of a temporary SQLite file")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    scratch = None
+    if args.url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        args.url = f"sqlite:///{scratch.name}"
+    engine = create_engine(args.url, connect_args={"timeout": 30} if args.url.startswith("sqlite") else {})
+    Session = sessionmaker(bind=engine)
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements
+        statements += 1
+
+    def scratch_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def counted(call):
+        before = statements
+        response = call()
+        return response.status_code, statements - before
+
+    try:
+        Base.metadata.create_all(engine)
+        settings.rate_limit_enabled = False
+        app.dependency_overrides[get_db] = scratch_db
+        app.dependency_overrides[require_admin] = lambda: None
+        client = TestClient(app, raise_server_exceptions=False)
+
+        def register(n):
+            return client.post("/api/auth/register", json={
+                "username": f"user{n}", "email": f"user{n}@example.com", "password": "correct horse"
+            })
+
+        def create_user(n):
+            return client.post("/api/admin/users", json={
+                "username": f"admin{n}", "email": f"admin{n}@example.com", "password": "correct horse"
+            })
+
+        def accept(token, n):
+            return client.post("/api/invitations/accept", json={
+                "token": token, "username": f"user{n}", "password": "correct horse", "first_name": "A", "last_name": "B"
+            })
+
+        print(f"{'endpoint':<34} {'new':>9} {'duplicate':>10}")
+        cases = [
+            ("POST /api/auth/register", lambda: register(1), lambda: register(1)),
+            ("POST /api/admin/users", lambda: create_user(1), lambda: create_user(1)),
+            ("POST /api/admin/invitations",
+             lambda: client.post("/api/admin/invitations", json=invitation_payload(1)),
+             lambda: client.post("/api/admin/invitations", json=invitation_payload(1))),
+        ]
+        for label, new, duplicate in cases:
+            new_status, new_count = counted(new)
+            duplicate_status, duplicate_count = counted(duplicate)
+            print(f"{label:<34} {new_count:>4} ({new_status}) {duplicate_count:>4} ({duplicate_status})")
+
+        if engine.dialect.name == "sqlite":
+            # SQLite drops the time zone of expires_at, which the invitation validity check needs
+            print(f"{'POST /api/invitations/accept':<34} {'(needs Postgres)':>20}")
+        else:
+            with Session() as db:
+                token = db.query(Invitation.token).filter(Invitation.email == "invitee1@example.com").scalar()
+            client.post("/api/admin/invitations", json=invitation_payload(2))
+            with Session() as db:
+                second_token = db.query(Invitation.token).filter(Invitation.email == "invitee2@example.com").scalar()
+            new_status, new_count = counted(lambda: accept(token, 100))
+            # The second invitation is accepted with the username the first one just took
+            duplicate_status, duplicate_count = counted(lambda: accept(second_token, 100))
+            print(f"{'POST /api/invitations/accept':<34} {new_count:>4} ({new_status}) {duplicate_count:>4} ({duplicate_status})")
+
+        results = []
+        barrier = threading.Barrier(args.concurrency)
+
+        def racer():
+            own_client = TestClient(app, raise_server_exceptions=False)
+            barrier.wait()
+            results.append(own_client.post("/api/auth/register", json={
+                "username": "racer", "email": "racer@example.com", "password": "correct horse"
+            }).status_code)
+
+        threads = [threading.Thread(target=racer) for _ in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with Session() as db:
+            created = db.query(func.count(User.id)).filter(User.username == "racer").scalar()
+        print(f"\n{args.concurrency} concurrent duplicate registrations: {dict(Counter(results))}, {created} user created")
+        return 0 if created == 1 and sorted(set(results)) == [200, 400] else 1
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+if __name__ == "__main__":
+    sys.exit(main())
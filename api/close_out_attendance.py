@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Close out attendance: mark employees without a record ABSENT and close open check-ins.
+
+Usage:
+    python close_out_attendance.py                      # yesterday
+    python close_out_attendance.py --date 2024-03-14
+    python close_out_attendance.py --start 2024-01-01 --end 2024-03-31
+
+Run it from cron shortly after midnight. It is safe to run again for days that
+were already closed out, which is also how a date range is backfilled. Open
+check-ins are closed at ATTENDANCE_AUTO_CHECKOUT_TIME of their day, or
+ATTENDANCE_AUTO_CHECKOUT_HOURS after check-in when that is set.
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+from app.core.database import SessionLocal
+from app.services.analytics_service import invalidate_attendance_analytics
+from app.services.calendar_service import close_out_attendance
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--date", type=date.fromisoformat, help="Single day to close out (default: yesterday)")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day of a range to backfill")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day of the range (default: yesterday)")
+    args = parser.parse_args()
+
+    yesterday = date.today() - timedelta(days=1)
+    if args.date and (args.start or args.end):
+        print("❌ Use either --date or --start/--end")
+        return 1
+    start_date = args.date or args.start or yesterday
+    end_date = args.date or args.end or yesterday
+    if start_date > end_date:
+        print("❌ --start must be on or before --end")
+        return 1
+    if end_date >= date.today():
+        print("❌ Only days before today can be closed out")
+        return 1
+
+    db = SessionLocal()
+    try:
+        result = close_out_attendance(db, start_date, end_date)
+    finally:
+        db.close()
+    # Reaches the running workers through CACHE_BACKEND unless it is "memory"
+    invalidate_attendance_analytics()
+    print(
+        f"✅ {start_date.isoformat()} .. {end_date.isoformat()}: {result['absent_created']} marked absent, "
+        f"{result['checked_out']} open check-ins closed"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
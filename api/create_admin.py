@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
 
-import asyncio
-from app.core.database import SessionLocal, get_db
-from app.core.auth import get_password_hash
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
 from app.models.user import User, UserRole
 
 def create_admin_user():
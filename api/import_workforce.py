@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Import users and their employee records from a CSV export of another HR system.
+
+Usage:
+    python import_workforce.py people.csv [--batch-size 500] [--credentials credentials.csv] [--restart]
+
+Columns: username, email, password, role, employee_id, first_name, last_name,
+phone, address, date_of_birth, hire_date, department, position, base_salary.
+Rows without a password get a random one, written to the credentials file.
+
+Rows are committed in batches. After each batch the last committed row is
+saved to `<file>.checkpoint`, and running the same command again resumes after
+it; --restart ignores the checkpoint. Invalid and conflicting rows are
+reported and skipped.
+"""
+
+import argparse
+import csv
+import os
+import sys
+from app.core.database import SessionLocal
+from app.services.workforce_service import WorkforceImportInterrupted, import_workforce, iter_workforce_csv
+
+def read_checkpoint(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return int(f.read().strip() or 0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--credentials", default="credentials.csv", help="Where generated passwords are appended")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first row")
+    args = parser.parse_args()
+
+    checkpoint_path = f"{args.file}.checkpoint"
+    start_after_row = 0 if args.restart else read_checkpoint(checkpoint_path)
+    if start_after_row:
+        print(f"Resuming after row {start_after_row}")
+
+    def on_checkpoint(last_row, credentials):
+        if credentials:
+            new_file = not os.path.exists(args.credentials)
+            # Passwords in plain text: readable by the owner only
+            with open(os.open(args.credentials, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600), "w", newline="") as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(["row", "username", "password"])
+                writer.writerows((c.row, c.username, c.password) for c in credentials)
+        with open(checkpoint_path, "w") as f:
+            f.write(str(last_row))
+        print(f"  committed up to row {last_row}")
+
+    db = SessionLocal()
+    try:
+        with open(args.file, encoding="utf-8-sig", newline="") as f:
+            result = import_workforce(
+                db, iter_workforce_csv(f), start_after_row, args.batch_size, on_checkpoint=on_checkpoint
+            )
+    except WorkforceImportInterrupted as interrupted:
+        print(f"❌ {interrupted}: {interrupted.__cause__}")
+        print(f"   Run the same command again to resume after row {interrupted.result['last_row']}")
+        return 1
+    finally:
+        db.close()
+
+    for error in result["errors"]:
+        print(f"❌ row {error.row} ({error.username or error.employee_id or '?'}): {error.detail}")
+    print(f"✅ Created {result['created']} users with employee records, {len(result['errors'])} rows skipped")
+    if result["credentials"]:
+        print(f"🔑 {len(result['credentials'])} generated passwords written to {args.credentials}")
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return 1 if result["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Maintain the monthly partitions of the Postgres attendance table.
+
+Usage:
+    python manage_partitions.py list
+    python manage_partitions.py create [--months-ahead 3]
+    python manage_partitions.py detach [--retention-months 84] [--drop]
+
+Run `create` and `detach` from cron (e.g. daily). Detached partitions are kept
+as standalone tables (attendance_yYYYYmMM) for archiving unless --drop is given.
+"""
+
+import argparse
+import sys
+from datetime import date
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.partition_service import (
+    add_months,
+    attendance_partitions,
+    detach_attendance_partitions,
+    ensure_future_attendance_partitions,
+    is_partitioned,
+    month_start,
+)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Show the monthly partitions")
+    create = commands.add_parser("create", help="Create partitions for upcoming months")
+    create.add_argument("--months-ahead", type=int, default=settings.attendance_partition_months_ahead)
+    detach = commands.add_parser("detach", help="Detach partitions older than the retention period")
+    detach.add_argument("--retention-months", type=int, default=settings.attendance_retention_months)
+    detach.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not is_partitioned(db):
+            print("❌ attendance is not a partitioned Postgres table; run the migrations first")
+            return 1
+
+        if args.command == "list":
+            for name, month in attendance_partitions(db):
+                print(f"{name}  {month.isoformat()} .. {add_months(month, 1).isoformat()}")
+        elif args.command == "create":
+            created = ensure_future_attendance_partitions(db, args.months_ahead)
+            print(f"✅ Created {len(created)} partition(s): {', '.join(created) or '-'}")
+        elif args.command == "detach":
+            if not args.retention_months:
+                print("❌ Set --retention-months or ATTENDANCE_RETENTION_MONTHS")
+                return 1
+            cutoff = add_months(month_start(date.today()), -args.retention_months)
+            detached = detach_attendance_partitions(db, cutoff, drop=args.drop)
+            action = "Dropped" if args.drop else "Detached"
+            print(f"✅ {action} {len(detached)} partition(s) before {cutoff.isoformat()}: {', '.join(detached) or '-'}")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
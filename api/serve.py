@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Production server: several uvicorn worker processes sized from CPU count and settings.
+
+Every worker opens its own SQLAlchemy pool, so the Postgres connection budget
+(DB_MAX_CONNECTIONS minus DB_RESERVED_CONNECTIONS for migrations and admin
+tools) is divided between them and passed to the workers through the
+DB_POOL_SIZE / DB_MAX_OVERFLOW environment variables. Connections a worker
+holds outside its pool are taken off its share first.
+"""
+
+import os
+import uvicorn
+from app.core.config import settings
+
+MIN_CONNECTIONS_PER_WORKER = 2
+
+def connection_budget() -> int:
+    return max(settings.db_max_connections - settings.db_reserved_connections, MIN_CONNECTIONS_PER_WORKER)
+
+def unpooled_connections() -> int:
+    """Connections each worker opens besides its pool: the readiness probe and LISTEN connections"""
+    unpooled = 1
+    if settings.event_backend == "postgres":
+        unpooled += 1
+    if settings.cache_backend == "postgres":
+        unpooled += 1
+    return unpooled
+
+def worker_count() -> int:
+    if settings.web_concurrency:
+        workers = settings.web_concurrency
+    else:
+        workers = min(2 * (os.cpu_count() or 1) + 1, settings.max_workers)
+    # Never start more workers than the database can give connections to
+    per_worker = MIN_CONNECTIONS_PER_WORKER + unpooled_connections()
+    return max(min(workers, connection_budget() // per_worker), 1)
+
+def configure_db_pool(workers: int):
+    per_worker = max(connection_budget() // workers - unpooled_connections(), MIN_CONNECTIONS_PER_WORKER)
+    pool_size = max(per_worker * 2 // 3, 1)
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(per_worker - pool_size)
+    return pool_size, per_worker - pool_size
+
+def main():
+    workers = worker_count()
+    pool_size, max_overflow = configure_db_pool(workers)
+
+    # Import the application once up front so configuration or import errors
+    # fail the launcher instead of crash-looping every worker
+    from app.main import app  # noqa: F401
+
+    print(f"🚀 Starting {workers} workers (DB pool {pool_size}+{max_overflow} per worker)")
+    uvicorn.run(
+        "app.main:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8000")),
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        proxy_headers=True,
+        limit_max_requests=settings.max_requests,
+        timeout_graceful_shutdown=settings.graceful_timeout,
+    )
+
+if __name__ == "__main__":
+    main()